@@ -189,7 +189,75 @@ async def get_meeting_captions_text(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meeting not found")
 
     captions_text = meeting.get("captions_text") or meeting.get("captionsText")
+    if not captions_text and meeting.get("archived"):
+        captions_text = await MeetingService(db).get_meeting_captions_text(meeting_id)
     if not captions_text:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No captions available for this meeting")
 
     return {"success": True, "captionsText": captions_text}
+
+
+@router.get("/runtime", response_model=dict)
+async def get_runtime_state(
+    memory: bool = True,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+
+    await _ensure_admin(current_user_id, db)
+
+    from app.services.presence_writer import presence_writer
+    from app.sockets.socket_manager import lifecycle, meetings
+
+    return {
+        "success": True,
+        "data": dict(lifecycle.report(memory), actors=meetings.stats(), presenceWrites=presence_writer.stats()),
+    }
+
+
+@router.get("/metrics/sockets", response_model=dict)
+async def get_socket_metrics(
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+
+    await _ensure_admin(current_user_id, db)
+
+    from app.sockets.socket_manager import caption_fanout, ice_batcher, presence, rate_limiter, socket_metrics
+
+    return {
+        "success": True,
+        "data": dict(
+            socket_metrics.snapshot(),
+            captionFanout=caption_fanout.stats(),
+            iceBatching=ice_batcher.stats(),
+            presence=presence.stats(),
+            rateLimits=rate_limiter.stats(),
+        )
+    }
+
+
+@router.get("/metrics/sockets/meetings/{meeting_id}", response_model=dict)
+async def get_meeting_socket_metrics(
+    meeting_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+
+    await _ensure_admin(current_user_id, db)
+
+    from app.sockets.socket_manager import meetings, socket_metrics
+
+    view = socket_metrics.meeting_snapshot(meeting_id)
+    if view is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meeting is not active on this worker")
+
+    runtime = meetings.peek(meeting_id)
+    return {
+        "success": True,
+        "data": dict(
+            view,
+            sockets=len(runtime.sids) if runtime else 0,
+            captionSubscribers={lang: len(sids) for lang, sids in runtime.subscribers.items()} if runtime else {},
+        )
+    }
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Header
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Header, Query
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import Optional
 
 from app.db.session import get_db
-from app.services.caption_service import CaptionService
+from app.services.caption_service import CaptionService, SUBTITLE_MEDIA_TYPES
 from app.core.security import get_current_user_id
+from fastapi.responses import StreamingResponse
 from app.db.models import USERS_COLLECTION
 from app.models.caption import CaptionEntryCreate
 import re
@@ -16,21 +17,31 @@ router = APIRouter()
 @router.get("/{meeting_id}", response_model=dict)
 async def get_captions(
     meeting_id: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after_cursor: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    speaker: Optional[str] = None,
+    fields: Optional[str] = None,
     user_id: str = Depends(get_current_user_id),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     caption_service = CaptionService(db)
-    captions = await caption_service.get_captions(meeting_id)
-    
-    if not captions:
-        return {
-            "success": True,
-            "captions": []
-        }
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    page = await caption_service.query_captions(
+        meeting_id,
+        since=since,
+        until=until,
+        after_cursor=after_cursor,
+        limit=limit,
+        speaker=speaker,
+        fields=field_list
+    )
     
     return {
         "success": True,
-        "captions": captions.get("captions", [])
+        "captions": page["captions"],
+        "nextCursor": page["next_cursor"]
     }
 
 
@@ -79,6 +90,7 @@ async def transcribe_and_save(
     audio_data = await audio.read()
     mime_type = audio.content_type
 
+    received_at = datetime.utcnow()
     result = await caption_service.transcribe_audio(audio_data, language, translate, mime_type)
     if not result.get("success"):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result.get("message", "Transcription failed"))
@@ -124,7 +136,9 @@ async def transcribe_and_save(
             original_language=detected_language or (language or "en"),
             translations=[],
             confidence=0.8,
+            timestamp=received_at,
             duration=duration,
+            offset=float(start),
             is_final=True
         )
 
@@ -156,6 +170,7 @@ async def transcribe_global(
     audio_data = await audio.read()
     mime_type = audio.content_type
 
+    received_at = datetime.utcnow()
     result = await caption_service.transcribe_audio(audio_data, language, translate, mime_type)
     if not result.get("success"):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result.get("message", "Transcription failed"))
@@ -174,10 +189,6 @@ async def transcribe_global(
     saved_count = 0
     filtered = []
 
-   
-    import re
-    from datetime import datetime
-
     for seg in segments:
         text = (seg.get("text") or "").strip()
         if not text or len(text) <= 2:
@@ -207,7 +218,9 @@ async def transcribe_global(
             original_language=detected_language or (language or "en"),
             translations=[],
             confidence=0.8,
+            timestamp=received_at,
             duration=duration,
+            offset=float(start),
             is_final=True
         )
 
@@ -298,3 +311,31 @@ async def export_captions(
         "language": language,
         "data": formatted_captions
     }
+
+
+@router.get("/{meeting_id}/stream")
+async def stream_captions(
+    meeting_id: str,
+    format: str = "vtt",
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+
+    if format not in SUBTITLE_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported format"
+        )
+
+    caption_service = CaptionService(db)
+    if not await caption_service.captions_exist(meeting_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Captions not found"
+        )
+
+    return StreamingResponse(
+        caption_service.stream_captions(meeting_id, format),
+        media_type=SUBTITLE_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="captions-{meeting_id}.{format}"'}
+    )
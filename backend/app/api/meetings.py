@@ -86,16 +86,15 @@ async def join_meeting(
 ):
 
     meeting_service = MeetingService(db)
-   
-    meeting = await meeting_service.get_meeting_by_id(meeting_id)
-    if not meeting:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meeting not found")
-
-    if meeting.get("status") == "ended":
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="This meeting has ended.")
 
     meeting = await meeting_service.join_meeting(meeting_id, user_id)
     if not meeting:
+        header = await meeting_service.get_header(meeting_id)
+        if not header:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meeting not found")
+
+        if header.get("status") == "ended":
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="This meeting has ended.")
     
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to join meeting")
     
@@ -332,7 +331,7 @@ async def get_meeting_captions(
     if not (is_host or is_participant):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view captions")
 
-    captions_text = meeting.get("captions_text")
+    captions_text = await meeting_service.get_meeting_captions_text(meeting_id)
     captions_file_path = meeting.get("captions_file_path")
     
     if not captions_text and not captions_file_path:
@@ -398,14 +397,16 @@ async def send_chat_message(
 async def get_chat_history(
     meeting_id: str,
     limit: int = 100,
+    before: Optional[str] = None,
     user_id: str = Depends(get_current_user_id),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     
     meeting_service = MeetingService(db)
-    messages = await meeting_service.get_chat_history(meeting_id, limit)
+    page = await meeting_service.get_chat_history(meeting_id, limit, before)
     
     return {
         "success": True,
-        "messages": messages
+        "messages": page["messages"],
+        "nextCursor": page["next_cursor"]
     }
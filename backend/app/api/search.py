@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Query
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import Optional
+
+from app.db.session import get_db
+from app.services.search_service import SearchService
+from app.core.security import get_current_user_id
+
+router = APIRouter()
+
+
+@router.get("/", response_model=dict)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    type: Optional[str] = None,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+
+    search_service = SearchService(db)
+    sources = [s.strip() for s in type.split(",") if s.strip()] if type else None
+    result = await search_service.search(user_id, q, skip=skip, limit=limit, sources=sources)
+
+    return {
+        "success": True,
+        "results": result["results"],
+        "hasMore": result["has_more"]
+    }
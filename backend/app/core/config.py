@@ -31,13 +31,89 @@ class Settings(BaseSettings):
     CLOUDINARY_API_SECRET: str
    
     WHISPER_MODEL_SIZE: str = "base"
+    # "whisper" or "stub" (fixed captions after TRANSCRIPTION_STUB_DELAY_MS, for load tests)
+    TRANSCRIPTION_BACKEND: str = "whisper"
+    TRANSCRIPTION_STUB_DELAY_MS: int = 200
     
     
     LIBRETRANSLATE_URL: str = "https://libretranslate.de/translate"
+    LIBRETRANSLATE_API_KEY: Optional[str] = None
+    TRANSLATION_BATCH_WINDOW_MS: int = 150
+    TRANSLATION_MAX_BATCH: int = 32
+    TRANSLATION_CACHE_SIZE: int = 10000
+    TRANSLATION_TIMEOUT_SECONDS: float = 10.0
+
+    CAPTION_REPLAY_BUFFER: int = 500
+    CAPTION_REPLAY_LIMIT: int = 1000
+    CAPTION_BATCH_WINDOW_MS: int = 40
+
+    AUDIO_STREAM_CHUNK_MS: int = 1000
+    AUDIO_STREAM_MAX_GAP_MS: int = 500
+    AUDIO_STREAM_MAX_PENDING_CHUNKS: int = 3
+
+    MEETING_CACHE_TTL_SECONDS: int = 300
+    MEETING_CACHE_SIZE: int = 5000
+    CHAT_HISTORY_SIZE: int = 100
+    CHAT_FLUSH_INTERVAL_MS: int = 250
+    CHAT_FLUSH_BATCH: int = 200
+    PRESENCE_FLUSH_INTERVAL_MS: int = 2000
+    PRESENCE_FLUSH_BATCH: int = 500
+    PRESENCE_RESTORE_GRACE_SECONDS: int = 30
+
+    ICE_BATCH_WINDOW_MS: int = 20
+    ICE_BATCH_MAX: int = 32
+
+    PRESENCE_TICK_MS: int = 100
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_MAX_DELAY_MS: int = 1000
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
+    RATE_LIMITS: dict[str, dict] = {
+        "connect": {"rate": 5, "burst": 30, "policy": "drop"},
+        "join-meeting": {"rate": 1, "burst": 5, "policy": "drop"},
+        "audio-data": {"rate": 4, "burst": 8, "policy": "drop"},
+        "send-chat-message": {"rate": 3, "burst": 10, "policy": "drop"},
+        "ice-candidate": {"rate": 50, "burst": 100, "policy": "delay"},
+        "ice-candidates": {"rate": 10, "burst": 20, "policy": "delay"},
+        "audio-frame": {"rate": 100, "burst": 200, "policy": "drop"},
+        "audio-stream-start": {"rate": 1, "burst": 5, "policy": "drop"},
+        "camera-state-changed": {"rate": 5, "burst": 10, "policy": "drop"},
+        "toggle-audio": {"rate": 5, "burst": 10, "policy": "drop"},
+        "toggle-video": {"rate": 5, "burst": 10, "policy": "drop"},
+        "presence-sync": {"rate": 1, "burst": 3, "policy": "drop"},
+    }
+
+    SOCKET_METRICS_ENABLED: bool = True
+
+    # "default" (JSON text packets) or "msgpack" (needs a msgpack parser on the client)
+    SOCKET_SERIALIZER: str = "default"
+    AUDIO_BINARY_ONLY: bool = False
+
+    STATE_BACKEND: str = "memory"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    STATE_KEY_PREFIX: str = "wwc"
+
+    # 1 runs a single uvicorn process; more (0 = one per core) starts the
+    # router on PORT with workers on WORKER_BASE_PORT and up
+    WORKERS: int = 1
+    WORKER_BASE_PORT: int = 5100
+    WORKER_LOAD_INTERVAL_SECONDS: int = 10
+
+    MEETING_ACTOR_IDLE_SECONDS: int = 60
+    # Consistent-hash ring of worker names; empty means this node owns every meeting
+    MEETING_NODES: list[str] = []
+    NODE_ID: str = ""
     
    
     UPLOAD_DIR: str = "uploads/captions"
+    TRANSCRIPT_DIR: str = "uploads/transcripts"
     MAX_UPLOAD_SIZE: int = 100 * 1024 * 1024  
+
+    ARCHIVE_ENABLED: bool = True
+    ARCHIVE_AFTER_DAYS: int = 7
+    ARCHIVE_INTERVAL_SECONDS: int = 3600
+    ARCHIVE_BATCH_SIZE: int = 50
+    ARCHIVE_CODEC: str = "gzip"
     
     SMTP_HOST: str | None = None
     SMTP_PORT: int | None = None
@@ -1,13 +1,30 @@
+import logging
+
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, TEXT
 from app.core.config import settings
+from app.db.models import (
+    MEETINGS_COLLECTION,
+    CAPTIONS_COLLECTION,
+    CAPTION_SEGMENTS_COLLECTION,
+    ARCHIVES_COLLECTION,
+    CHAT_MESSAGES_COLLECTION,
+)
 
 client: AsyncIOMotorClient = None
 
+logger = logging.getLogger(__name__)
+
 
 async def connect_to_mongo():
    
     global client
-    client = AsyncIOMotorClient(settings.MONGODB_URI)
+    if settings.MONGODB_URI.startswith("mongomock://"):
+        # In-process stand-in for development and load tests; nothing is persisted.
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+    else:
+        client = AsyncIOMotorClient(settings.MONGODB_URI)
     print(f"Connected to MongoDB at {settings.MONGODB_URI}")
 
 
@@ -22,3 +39,27 @@ async def close_mongo_connection():
 def get_database():
    
     return client[settings.DATABASE_NAME]
+
+
+async def ensure_indexes():
+
+    db = get_database()
+    specs = [
+        (MEETINGS_COLLECTION, [("meeting_id", ASCENDING)], {"unique": True}),
+        (MEETINGS_COLLECTION, [("host", ASCENDING)], {}),
+        (MEETINGS_COLLECTION, [("participants.user", ASCENDING)], {}),
+        (MEETINGS_COLLECTION, [("status", ASCENDING), ("end_time", ASCENDING)], {}),
+        (CAPTIONS_COLLECTION, [("meeting_id", ASCENDING)], {"unique": True}),
+        (CAPTION_SEGMENTS_COLLECTION, [("meeting_id", ASCENDING), ("seq", ASCENDING)], {"unique": True}),
+        (CAPTION_SEGMENTS_COLLECTION, [("meeting_id", ASCENDING), ("timestamp", ASCENDING)], {}),
+        (CAPTION_SEGMENTS_COLLECTION, [("meeting_id", ASCENDING), ("speaker", ASCENDING), ("seq", ASCENDING)], {}),
+        (CAPTION_SEGMENTS_COLLECTION, [("original_text", TEXT)], {"default_language": "none"}),
+        (ARCHIVES_COLLECTION, [("meeting_id", ASCENDING)], {"unique": True}),
+        (CHAT_MESSAGES_COLLECTION, [("meeting_id", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)], {}),
+        (CHAT_MESSAGES_COLLECTION, [("text", TEXT)], {"default_language": "none"}),
+    ]
+    for collection, keys, options in specs:
+        try:
+            await db[collection].create_index(keys, **options)
+        except Exception:
+            logger.exception("Failed to create index %s on %s", keys, collection)
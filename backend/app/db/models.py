@@ -2,3 +2,7 @@
 USERS_COLLECTION = "users"
 MEETINGS_COLLECTION = "meetings"
 CAPTIONS_COLLECTION = "captions"
+CAPTION_SEGMENTS_COLLECTION = "caption_segments"
+ARCHIVES_COLLECTION = "meeting_archives"
+TRANSLATION_CACHE_COLLECTION = "translation_cache"
+CHAT_MESSAGES_COLLECTION = "chat_messages"
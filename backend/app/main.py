@@ -1,12 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import socketio
+import asyncio
+import os
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.db.base import connect_to_mongo, close_mongo_connection
-from app.api import auth, users, meetings, captions, admin
-from app.sockets.socket_manager import sio
+from app.db.base import connect_to_mongo, close_mongo_connection, ensure_indexes, get_database
+from app.services.archive_service import run_archiver
+from app.services.translation_service import close_translation_service
+from app.services.chat_writer import chat_writer
+from app.services.presence_writer import presence_writer
+from app.api import auth, users, meetings, captions, admin, search
+from app.sockets.socket_manager import sio, state, socket_metrics, meetings as meeting_actors
 from app.utils.io import set_io
 import logging
 import app.core.cloudinary
@@ -16,10 +22,27 @@ import app.core.cloudinary
 async def lifespan(app: FastAPI):
 
     await connect_to_mongo()
+    await ensure_indexes()
+    archiver = asyncio.create_task(run_archiver(get_database())) if settings.ARCHIVE_ENABLED else None
+    # Drop sockets a crashed predecessor left in shared state before
+    # presence restore asks who is still connected.
+    await state.purge_node()
+    presence_restore = asyncio.create_task(
+        presence_writer.restore(state.find_user_socket, settings.PRESENCE_RESTORE_GRACE_SECONDS)
+    )
     logging.info(f"Starting {settings.APP_NAME}")
     logging.info(f"Allowed origins: {settings.ALLOWED_ORIGINS}")
     yield
 
+    if archiver:
+        archiver.cancel()
+    presence_restore.cancel()
+    await close_translation_service()
+    await chat_writer.close()
+    await presence_writer.close()
+    await meeting_actors.close()
+    await state.close()
+
     await close_mongo_connection()
     logging.info(f"Shutting down {settings.APP_NAME}")
 
@@ -54,6 +77,7 @@ app.include_router(users.router, prefix=f"{settings.API_V1_PREFIX}/users", tags=
 app.include_router(meetings.router, prefix=f"{settings.API_V1_PREFIX}/meetings", tags=["meetings"])
 app.include_router(captions.router, prefix=f"{settings.API_V1_PREFIX}/captions", tags=["captions"])
 app.include_router(admin.router, prefix=f"{settings.API_V1_PREFIX}/admin", tags=["admin"])
+app.include_router(search.router, prefix=f"{settings.API_V1_PREFIX}/search", tags=["search"])
 
 
 @app.get("/")
@@ -72,4 +96,28 @@ async def health():
     return {"status": "healthy"}
 
 
+def _rss_bytes():
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+@app.get("/health/load")
+async def health_load():
+
+    return {
+        "node": settings.NODE_ID or None,
+        "pid": os.getpid(),
+        "rssBytes": _rss_bytes(),
+        "sockets": len(sio.eio.sockets),
+        "meetings": meeting_actors.stats(),
+        "emits": sum(s.emits for s in socket_metrics.emitted.values()),
+        "recipients": sum(s.recipients for s in socket_metrics.emitted.values()),
+        "handlerCalls": sum(s.calls for s in socket_metrics.handlers.values()),
+    }
+
+
 application = socket_app
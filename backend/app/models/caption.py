@@ -19,6 +19,7 @@ class CaptionEntry(BaseModel):
     confidence: float = 0.8
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     duration: float = 0.0
+    offset: float = 0.0
     is_final: bool = False
 
 
@@ -58,5 +59,7 @@ class CaptionEntryCreate(BaseModel):
     original_language: str = "en"
     translations: List[Translation] = []
     confidence: float = 0.8
+    timestamp: Optional[datetime] = None
     duration: float = 0.0
+    offset: float = 0.0
     is_final: bool = False
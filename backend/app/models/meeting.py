@@ -30,6 +30,7 @@ class Recording(BaseModel):
 
 
 class ChatMessage(BaseModel):
+    meeting_id: Optional[str] = None
     sender: Optional[str] = None
     sender_name: str
     text: str = Field(..., max_length=2000)
@@ -64,7 +65,6 @@ class MeetingInDB(MeetingBase):
     end_time: Optional[datetime] = None
     captions_text: Optional[str] = None
     captions_file_path: Optional[str] = None
-    messages: List[ChatMessage] = []
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Config:
@@ -83,7 +83,6 @@ class Meeting(MeetingBase):
     end_time: Optional[datetime] = None
     captions_text: Optional[str] = None
     captions_file_path: Optional[str] = None
-    messages: List[ChatMessage] = []
     created_at: datetime
 
     class Config:
@@ -0,0 +1,190 @@
+import asyncio
+import gzip
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Hashable, List, Optional, Tuple
+
+import bson
+from bson import Binary
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.db.models import (
+    MEETINGS_COLLECTION,
+    CAPTIONS_COLLECTION,
+    CAPTION_SEGMENTS_COLLECTION,
+    ARCHIVES_COLLECTION,
+    CHAT_MESSAGES_COLLECTION,
+)
+
+logger = logging.getLogger(__name__)
+
+# A stored archive must still fit in a single 16 MB Mongo document.
+MAX_ARCHIVE_BYTES = 15 * 1024 * 1024
+CLAIM_TIMEOUT = timedelta(hours=1)
+
+
+def _compress(data: bytes) -> Tuple[str, bytes]:
+
+    if settings.ARCHIVE_CODEC == "zstd":
+        try:
+            import zstandard
+            return "zstd", zstandard.ZstdCompressor(level=10).compress(data)
+        except ImportError:
+            logger.warning("zstandard is not installed; archiving with gzip")
+    return "gzip", gzip.compress(data, compresslevel=6)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _merge(archived: List[dict], hot: List[dict], key: Callable[[dict], Hashable]) -> List[dict]:
+
+    # A retry after a partial delete sees only what is left in the hot
+    # tier, so the archived copy keeps everything already removed.
+    merged = {key(item): item for item in archived}
+    merged.update((key(item), item) for item in hot)
+    return list(merged.values())
+
+
+def _message_key(message: dict) -> Hashable:
+
+    # Messages embedded in the meeting before chat_messages have no _id.
+    return message.get("_id") or (message.get("timestamp"), message.get("sender"), message.get("text"))
+
+
+def _message_position(message: dict) -> tuple:
+
+    return message.get("timestamp") or datetime.min, str(message.get("_id", ""))
+
+
+class ArchiveService:
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.meetings = db[MEETINGS_COLLECTION]
+        self.captions = db[CAPTIONS_COLLECTION]
+        self.segments = db[CAPTION_SEGMENTS_COLLECTION]
+        self.archives = db[ARCHIVES_COLLECTION]
+        self.chat = db[CHAT_MESSAGES_COLLECTION]
+
+    async def load(self, meeting_id: str) -> Optional[dict]:
+
+        doc = await self.archives.find_one({"meeting_id": meeting_id})
+        if not doc:
+            return None
+        raw = await asyncio.to_thread(_decompress, doc.get("codec", "gzip"), bytes(doc["data"]))
+        return bson.decode(raw)
+
+    async def archive_meeting(self, meeting_id: str) -> bool:
+
+        now = datetime.utcnow()
+        meeting = await self.meetings.find_one_and_update(
+            {
+                "meeting_id": meeting_id,
+                "status": "ended",
+                "archived": {"$ne": True},
+                "$or": [
+                    {"archiving_at": {"$exists": False}},
+                    {"archiving_at": {"$lt": now - CLAIM_TIMEOUT}},
+                ],
+            },
+            {"$set": {"archiving_at": now}},
+            projection={"captions_text": 1, "messages": 1}
+        )
+        if not meeting:
+            return False
+
+        try:
+            # A previous run may have died after deleting part of the hot
+            # data, so the hot rows are merged into what is already archived.
+            previous = await self.load(meeting_id) or {}
+            captions = await self.segments.find(
+                {"meeting_id": meeting_id},
+                {"_id": 0, "meeting_id": 0}
+            ).sort("seq", 1).to_list(length=None)
+            messages = await self.chat.find(
+                {"meeting_id": meeting_id},
+                {"meeting_id": 0}
+            ).sort([("timestamp", 1), ("_id", 1)]).to_list(length=None)
+
+            captions = _merge(previous.get("captions", []), captions, lambda c: c["seq"])
+            messages = _merge(previous.get("messages", []), messages or meeting.get("messages") or [], _message_key)
+            payload = {
+                "meeting_id": meeting_id,
+                "captions": sorted(captions, key=lambda c: c["seq"]),
+                "captions_text": meeting.get("captions_text") or previous.get("captions_text"),
+                "messages": sorted(messages, key=_message_position),
+            }
+            raw = bson.encode(payload)
+            codec, blob = await asyncio.to_thread(_compress, raw)
+            if len(blob) > MAX_ARCHIVE_BYTES:
+                logger.warning("Archive for meeting %s is %s bytes; leaving it in the hot tier", meeting_id, len(blob))
+                await self.meetings.update_one({"meeting_id": meeting_id}, {"$set": {"archive_skipped": True}, "$unset": {"archiving_at": ""}})
+                return False
+
+            await self.archives.replace_one(
+                {"meeting_id": meeting_id},
+                {
+                    "meeting_id": meeting_id,
+                    "codec": codec,
+                    "data": Binary(blob),
+                    "raw_bytes": len(raw),
+                    "stored_bytes": len(blob),
+                    "caption_count": len(payload["captions"]),
+                    "message_count": len(payload["messages"]),
+                    "archived_at": now,
+                },
+                upsert=True
+            )
+
+            await self.segments.delete_many({"meeting_id": meeting_id})
+            await self.chat.delete_many({"meeting_id": meeting_id})
+            await self.captions.update_one(
+                {"meeting_id": meeting_id},
+                {"$set": {"archived": True, "captions": []}}
+            )
+            await self.meetings.update_one(
+                {"meeting_id": meeting_id},
+                {
+                    "$set": {"archived": True, "archived_at": now},
+                    "$unset": {"captions_text": "", "messages": "", "archiving_at": ""},
+                }
+            )
+            logger.info("Archived meeting %s: %s -> %s bytes (%s)", meeting_id, len(raw), len(blob), codec)
+            return True
+        except Exception:
+            logger.exception("Failed to archive meeting %s", meeting_id)
+            await self.meetings.update_one({"meeting_id": meeting_id}, {"$unset": {"archiving_at": ""}})
+            return False
+
+    async def archive_expired(self, limit: Optional[int] = None) -> int:
+
+        cutoff = datetime.utcnow() - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+        cursor = self.meetings.find(
+            {"status": "ended", "end_time": {"$lt": cutoff}, "archived": {"$ne": True}, "archive_skipped": {"$ne": True}},
+            {"meeting_id": 1}
+        ).limit(limit or settings.ARCHIVE_BATCH_SIZE)
+
+        archived = 0
+        async for meeting in cursor:
+            if await self.archive_meeting(meeting["meeting_id"]):
+                archived += 1
+        return archived
+
+
+async def run_archiver(db: AsyncIOMotorDatabase) -> None:
+
+    service = ArchiveService(db)
+    while True:
+        try:
+            count = await service.archive_expired()
+            if count:
+                logger.info("Archived %s ended meetings", count)
+        except Exception:
+            logger.exception("Archiver pass failed")
+        await asyncio.sleep(settings.ARCHIVE_INTERVAL_SECONDS)
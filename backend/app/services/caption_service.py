@@ -1,40 +1,255 @@
+import asyncio
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, AsyncIterator
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
 import tempfile
 import os
+import numpy as np
 from faster_whisper import WhisperModel
 from app.services.captions_whisper_service import convert_to_wav_file
+from app.services import transcript_service
+from app.services.archive_service import ArchiveService
 
-from app.db.models import CAPTIONS_COLLECTION
+from app.db.models import CAPTIONS_COLLECTION, CAPTION_SEGMENTS_COLLECTION, MEETINGS_COLLECTION
 from app.core.config import settings
-from app.models.caption import CaptionEntryCreate
+from app.models.caption import CaptionEntryCreate, Translation
 
 
-class CaptionService:
-    def __init__(self, db: AsyncIOMotorDatabase):
-        self.db = db
-        self.collection = db[CAPTIONS_COLLECTION]
-  
-        self.whisper_model = WhisperModel(
+CAPTION_FIELDS = (
+    "seq",
+    "speaker",
+    "speaker_name",
+    "original_text",
+    "original_language",
+    "translations",
+    "confidence",
+    "timestamp",
+    "duration",
+    "offset",
+    "is_final",
+)
+
+MAX_CAPTIONS_PAGE = 1000
+STREAM_BATCH_SIZE = 500
+
+SUBTITLE_MEDIA_TYPES = {
+    "vtt": "text/vtt",
+    "srt": "application/x-subrip",
+    "txt": "text/plain",
+}
+
+_whisper_model: Optional[WhisperModel] = None
+
+STUB_TEXT = "stub caption"
+
+
+def _get_whisper_model() -> WhisperModel:
+
+    global _whisper_model
+    if _whisper_model is None:
+        _whisper_model = WhisperModel(
             settings.WHISPER_MODEL_SIZE,
             device="cpu",
             compute_type="int8"
         )
+    return _whisper_model
+
+
+async def _stub_transcription(seconds: float, language: Optional[str]) -> dict:
+
+    # TRANSCRIPTION_BACKEND=stub: fixed text after a fixed delay, so load tests
+    # exercise the caption pipeline without a model or ffmpeg.
+    await asyncio.sleep(settings.TRANSCRIPTION_STUB_DELAY_MS / 1000.0)
+    return {
+        'success': True,
+        'language': language or 'en',
+        'captions': [{'start': 0.0, 'end': seconds, 'text': STUB_TEXT}]
+    }
+
+
+def _cue_time(seconds: float, separator: str) -> str:
+
+    millis = int(round(max(0.0, seconds) * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def _cue_bounds(caption: dict, origin: Optional[datetime]) -> tuple:
+
+    start = 0.0
+    ts = caption.get("timestamp")
+    if isinstance(ts, datetime) and origin:
+        start = (ts - origin).total_seconds()
+    start = max(0.0, start + float(caption.get("offset") or 0.0))
+    duration = max(0.001, float(caption.get("duration") or 0.0))
+    return start, start + duration
+
+
+def format_cue(caption: dict, index: int, format: str, origin: Optional[datetime]) -> str:
+
+    text = caption.get("original_text") or caption.get("text") or ""
+    if format in ("srt", "vtt"):
+        separator = "," if format == "srt" else "."
+        start, end = _cue_bounds(caption, origin)
+        timing = f"{_cue_time(start, separator)} --> {_cue_time(end, separator)}"
+        if format == "srt":
+            return f"{index}\n{timing}\n{text}\n\n"
+        return f"{timing}\n{text}\n\n"
+
+    speaker = caption.get("speaker_name") or caption.get("speaker") or "Unknown"
+    ts = caption.get("timestamp")
+    if isinstance(ts, datetime):
+        ts = ts.strftime("%Y-%m-%d %H:%M:%S")
+    return f"[{ts or ''}] {speaker}: {text}\n"
+
+
+def _page_archived(
+    captions: List[dict],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    after_cursor: Optional[int],
+    limit: Optional[int],
+    speaker: Optional[str],
+    fields: Optional[List[str]]
+) -> dict:
+
+    items = []
+    for caption in captions:
+        ts = caption.get("timestamp")
+        if after_cursor is not None and caption.get("seq", 0) <= after_cursor:
+            continue
+        if since and (not ts or ts < since):
+            continue
+        if until and (not ts or ts >= until):
+            continue
+        if speaker and caption.get("speaker") != speaker:
+            continue
+        items.append(caption)
+
+    next_cursor = None
+    if limit:
+        limit = min(limit, MAX_CAPTIONS_PAGE)
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = items[-1]["seq"]
+
+    if fields:
+        keep = {f for f in fields if f in CAPTION_FIELDS} | {"seq"}
+        items = [{k: v for k, v in c.items() if k in keep} for c in items]
+
+    return {"captions": items, "next_cursor": next_cursor}
+
+
+class CaptionService:
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.collection = db[CAPTIONS_COLLECTION]
+        self.segments = db[CAPTION_SEGMENTS_COLLECTION]
+
+    @property
+    def whisper_model(self) -> WhisperModel:
+        return _get_whisper_model()
     
     async def get_captions(self, meeting_id: str) -> Optional[dict]:
         
-        captions = await self.collection.find_one({"meeting_id": meeting_id})
-        if captions:
-            return self._serialize_captions(captions)
-        return None
+        captions = await self._load_meta(meeting_id)
+        if not captions:
+            return None
+
+        if captions.get("archived"):
+            captions["captions"] = await self._archived_captions(meeting_id)
+        else:
+            cursor = self.segments.find({"meeting_id": meeting_id}, self._projection()).sort("seq", 1)
+            captions["captions"] = await cursor.to_list(length=None)
+        return self._serialize_captions(captions)
+
+    async def query_captions(
+        self,
+        meeting_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        after_cursor: Optional[int] = None,
+        limit: Optional[int] = None,
+        speaker: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> dict:
+
+        meta = await self._load_meta(meeting_id)
+        if meta and meta.get("archived"):
+            archived = await self._archived_captions(meeting_id)
+            return _page_archived(archived, since, until, after_cursor, limit, speaker, fields)
+
+        query = {"meeting_id": meeting_id}
+        if after_cursor is not None:
+            query["seq"] = {"$gt": after_cursor}
+        if since or until:
+            query["timestamp"] = {}
+            if since:
+                query["timestamp"]["$gte"] = since
+            if until:
+                query["timestamp"]["$lt"] = until
+        if speaker:
+            query["speaker"] = speaker
+
+        cursor = self.segments.find(query, self._projection(fields)).sort("seq", 1)
+        if limit:
+            limit = min(limit, MAX_CAPTIONS_PAGE)
+            cursor = cursor.limit(limit + 1)
+        items = await cursor.to_list(length=None)
+
+        next_cursor = None
+        if limit and len(items) > limit:
+            items = items[:limit]
+            next_cursor = items[-1]["seq"]
+
+        return {"captions": items, "next_cursor": next_cursor}
+
+    async def captions_exist(self, meeting_id: str) -> bool:
+
+        return await self._load_meta(meeting_id) is not None
+
+    async def stream_captions(self, meeting_id: str, format: str = "vtt") -> AsyncIterator[str]:
+
+        meta = await self._load_meta(meeting_id)
+        origin = await self._caption_origin(meeting_id)
+        if format == "vtt":
+            yield "WEBVTT\n\n"
+
+        if meta and meta.get("archived"):
+            captions = await self._archived_captions(meeting_id)
+            for index, caption in enumerate(captions, 1):
+                yield format_cue(caption, index, format, origin)
+            return
+
+        cursor = self.segments.find(
+            {"meeting_id": meeting_id},
+            self._projection()
+        ).sort("seq", 1).batch_size(STREAM_BATCH_SIZE)
+
+        index = 0
+        async for caption in cursor:
+            index += 1
+            yield format_cue(caption, index, format, origin)
+
+    async def _caption_origin(self, meeting_id: str) -> Optional[datetime]:
+
+        meeting = await self.db[MEETINGS_COLLECTION].find_one({"meeting_id": meeting_id}, {"start_time": 1})
+        if meeting and meeting.get("start_time"):
+            return meeting["start_time"]
+        meta = await self.collection.find_one({"meeting_id": meeting_id}, {"created_at": 1})
+        return meta.get("created_at") if meta else None
     
     async def create_captions(self, meeting_id: str) -> dict:
       
         captions_dict = {
             "meeting_id": meeting_id,
             "captions": [],
+            "next_seq": 0,
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         }
@@ -43,36 +258,98 @@ class CaptionService:
         captions_dict["_id"] = result.inserted_id
         return self._serialize_captions(captions_dict)
     
-    async def add_caption(self, meeting_id: str, caption: CaptionEntryCreate) -> bool:
-    
-     
-        existing = await self.collection.find_one({"meeting_id": meeting_id})
-        
-        if not existing:
-       
-            await self.create_captions(meeting_id)
-        
+    async def add_caption(self, meeting_id: str, caption: CaptionEntryCreate) -> Optional[int]:
+
+        now = datetime.utcnow()
+        meta = await self.collection.find_one_and_update(
+            {"meeting_id": meeting_id},
+            {
+                "$inc": {"next_seq": 1},
+                "$set": {"updated_at": now},
+                "$setOnInsert": {"created_at": now},
+            },
+            projection={"next_seq": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        seq = meta["next_seq"]
+
         caption_entry = {
+            "meeting_id": meeting_id,
+            "seq": seq,
             "speaker": caption.speaker,
             "speaker_name": caption.speaker_name,
             "original_text": caption.original_text,
             "original_language": caption.original_language,
             "translations": [t.model_dump() for t in caption.translations],
             "confidence": caption.confidence,
-            "timestamp": datetime.utcnow(),
+            "timestamp": caption.timestamp or now,
             "duration": caption.duration,
+            "offset": caption.offset,
             "is_final": caption.is_final
         }
-        
-        result = await self.collection.update_one(
-            {"meeting_id": meeting_id},
-            {
-                "$push": {"captions": caption_entry},
-                "$set": {"updated_at": datetime.utcnow()}
-            }
+
+        await self.segments.insert_one(caption_entry)
+        if caption.is_final:
+            transcript_service.append_line(meeting_id, format_cue(caption_entry, seq, "txt", None))
+        return seq
+
+    async def add_translations(self, meeting_id: str, seq: int, translations: List[Translation]) -> bool:
+
+        if not translations:
+            return False
+        result = await self.segments.update_one(
+            {"meeting_id": meeting_id, "seq": seq},
+            {"$push": {"translations": {"$each": [t.model_dump() for t in translations]}}}
         )
-        
         return result.modified_count > 0
+
+    async def _load_meta(self, meeting_id: str) -> Optional[dict]:
+
+        meta = await self.collection.find_one({"meeting_id": meeting_id}, {"captions": {"$slice": 1}})
+        if meta and meta.get("captions"):
+            await self._migrate_legacy_captions(await self.collection.find_one({"_id": meta["_id"]}))
+        return meta
+
+    async def _archived_captions(self, meeting_id: str) -> List[dict]:
+
+        archive = await ArchiveService(self.db).load(meeting_id)
+        return archive.get("captions", []) if archive else []
+
+    async def _migrate_legacy_captions(self, captions: dict) -> None:
+
+        legacy = captions.get("captions") or []
+        if not legacy:
+            return
+
+        # Legacy entries are numbered up to 0 so they sort before every
+        # segment allocated from next_seq, which starts at 1.
+        base = 1 - len(legacy)
+        entries = []
+        for idx, entry in enumerate(legacy):
+            doc = {k: entry.get(k) for k in CAPTION_FIELDS if k != "seq"}
+            doc["meeting_id"] = captions["meeting_id"]
+            doc["seq"] = base + idx
+            entries.append(doc)
+
+        try:
+            await self.segments.insert_many(entries, ordered=False)
+        except BulkWriteError:
+            pass
+
+        await self.collection.update_one({"_id": captions["_id"]}, {"$set": {"captions": []}})
+
+    def _projection(self, fields: Optional[List[str]] = None) -> dict:
+
+        projection = {"_id": 0}
+        if fields:
+            for field in fields:
+                if field in CAPTION_FIELDS:
+                    projection[field] = 1
+            projection["seq"] = 1
+        else:
+            projection["meeting_id"] = 0
+        return projection
     
     async def transcribe_audio(
         self,
@@ -82,6 +359,9 @@ class CaptionService:
         mime_type: Optional[str] = None
     ) -> dict:
     
+        if settings.TRANSCRIPTION_BACKEND == "stub":
+            return await _stub_transcription(1.0, language)
+
         try:
        
             converted_path = None
@@ -154,16 +434,39 @@ class CaptionService:
             except Exception:
                 pass
     
+    async def transcribe_pcm(self, pcm: bytes, language: Optional[str] = None, translate: bool = False) -> dict:
+
+        if settings.TRANSCRIPTION_BACKEND == "stub":
+            return await _stub_transcription(len(pcm) / 32000.0, language)
+
+        # Streamed audio is already 16 kHz mono PCM16, so it skips ffmpeg and
+        # temp files and goes to the model as a float array.
+        def _run():
+            samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+            segments, info = self.whisper_model.transcribe(
+                samples,
+                language=language,
+                task='translate' if translate else 'transcribe'
+            )
+            return [{'start': s.start, 'end': s.end, 'text': s.text} for s in segments], info
+
+        captions, info = await asyncio.to_thread(_run)
+        return {
+            'success': True,
+            'language': getattr(info, 'language', language),
+            'captions': captions
+        }
+
     async def delete_captions(self, meeting_id: str) -> bool:
         
         result = await self.collection.delete_one({"meeting_id": meeting_id})
-        return result.deleted_count > 0
+        segments = await self.segments.delete_many({"meeting_id": meeting_id})
+        transcript_service.discard(meeting_id)
+        return result.deleted_count > 0 or segments.deleted_count > 0
     
-    def format_captions(self, captions: List[dict], format: str = "txt") -> str:
+    def format_captions(self, captions: List[dict], format: str = "txt", origin: Optional[datetime] = None) -> str:
       
         if format == "txt":
-         
-            from datetime import datetime
 
             def fmt_ts(ts):
                 if not ts:
@@ -200,33 +503,11 @@ class CaptionService:
 
             return "\n".join(parts)
         
-        elif format == "srt":
-            lines = []
-            for i, caption in enumerate(captions, 1):
-                start = caption.get("timestamp", "00:00:00,000")
-                duration = caption.get("duration", 0)
-            
-                end = start
-                text = caption.get("original_text", "")
-                
-                lines.append(str(i))
-                lines.append(f"{start} --> {end}")
-                lines.append(text)
-                lines.append("")
-            return "\n".join(lines)
-        
-        elif format == "vtt":
-            lines = ["WEBVTT", ""]
-            for caption in captions:
-                start = caption.get("timestamp", "00:00:00.000")
-                duration = caption.get("duration", 0)
-                end = start
-                text = caption.get("original_text", "")
-                
-                lines.append(f"{start} --> {end}")
-                lines.append(text)
-                lines.append("")
-            return "\n".join(lines)
+        elif format in ("srt", "vtt"):
+            if origin is None:
+                origin = next((c.get("timestamp") for c in captions if isinstance(c.get("timestamp"), datetime)), None)
+            header = "WEBVTT\n\n" if format == "vtt" else ""
+            return header + "".join(format_cue(c, i, format, origin) for i, c in enumerate(captions, 1))
         
         else:
             return ""
@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
+
+from app.db.models import CHAT_MESSAGES_COLLECTION
+
+MAX_CHAT_PAGE = 200
+EPOCH = datetime(1970, 1, 1)
+MIN_OBJECT_ID = ObjectId("0" * 24)
+
+
+def chat_message(meeting_id: str, sender: Optional[str], sender_name: str, text: str, timestamp: Optional[datetime] = None) -> dict:
+
+    timestamp = timestamp or datetime.utcnow()
+    return {
+        "_id": ObjectId(),
+        "meeting_id": meeting_id,
+        "sender": sender,
+        "sender_name": sender_name,
+        "text": text,
+        # Mongo keeps milliseconds; truncating here keeps cursors built from
+        # in-memory messages identical to the stored ones.
+        "timestamp": timestamp.replace(microsecond=timestamp.microsecond // 1000 * 1000),
+    }
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, ObjectId]]:
+
+    try:
+        millis, oid = cursor.split("_", 1)
+        return EPOCH + timedelta(milliseconds=int(millis)), ObjectId(oid)
+    except Exception:
+        return None
+
+
+def _position(message: dict) -> Tuple[datetime, ObjectId]:
+
+    return message.get("timestamp") or EPOCH, message.get("_id") or MIN_OBJECT_ID
+
+
+def encode_cursor(message: dict) -> str:
+
+    timestamp, oid = _position(message)
+    millis = (timestamp - EPOCH) // timedelta(milliseconds=1)
+    return f"{millis}_{oid}"
+
+
+def page_messages(messages: List[dict], before: Optional[str], limit: int, complete: bool = True) -> dict:
+
+    # Pages an in-memory, oldest-first list the same way ChatService.page
+    # pages the collection; complete=False means older messages exist elsewhere.
+    limit = max(1, min(limit, MAX_CHAT_PAGE))
+    position = decode_cursor(before) if before else None
+    if position:
+        messages = [m for m in messages if _position(m) < position]
+
+    page = messages[-limit:]
+    has_more = len(messages) > limit or (not complete and len(page) == limit)
+    return {"messages": page, "next_cursor": encode_cursor(page[0]) if has_more and page else None}
+
+
+class ChatService:
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.collection = db[CHAT_MESSAGES_COLLECTION]
+
+    async def add_message(self, meeting_id: str, sender: Optional[str], sender_name: str, text: str) -> dict:
+
+        message = chat_message(meeting_id, sender, sender_name, text)
+        await self.collection.insert_one(message)
+        return message
+
+    async def insert_many(self, messages: List[dict]) -> None:
+
+        if not messages:
+            return
+        try:
+            await self.collection.insert_many(messages, ordered=False)
+        except BulkWriteError as e:
+            # Retried batches may already be partly stored; duplicate ids are fine.
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+
+    async def recent(self, meeting_id: str, limit: int) -> List[dict]:
+
+        messages = await self.collection.find(
+            {"meeting_id": meeting_id}
+        ).sort([("timestamp", DESCENDING), ("_id", DESCENDING)]).limit(limit).to_list(length=limit)
+        messages.reverse()
+        return messages
+
+    async def page(self, meeting_id: str, before: Optional[str] = None, limit: int = 100) -> dict:
+
+        limit = max(1, min(limit, MAX_CHAT_PAGE))
+        query: dict = {"meeting_id": meeting_id}
+        position = decode_cursor(before) if before else None
+        if position:
+            ts, oid = position
+            query["$or"] = [
+                {"timestamp": {"$lt": ts}},
+                {"timestamp": ts, "_id": {"$lt": oid}},
+            ]
+
+        messages = await self.collection.find(query).sort(
+            [("timestamp", DESCENDING), ("_id", DESCENDING)]
+        ).limit(limit + 1).to_list(length=limit + 1)
+
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        next_cursor = encode_cursor(messages[-1]) if has_more else None
+        messages.reverse()
+        return {"messages": messages, "next_cursor": next_cursor}
+
+    async def all_for_meeting(self, meeting_id: str) -> List[dict]:
+
+        return await self.collection.find(
+            {"meeting_id": meeting_id},
+            {"meeting_id": 0}
+        ).sort([("timestamp", ASCENDING), ("_id", ASCENDING)]).to_list(length=None)
+
+    async def delete_for_meeting(self, meeting_id: str) -> int:
+
+        result = await self.collection.delete_many({"meeting_id": meeting_id})
+        return result.deleted_count
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.db.base import get_database
+from app.services.chat_service import ChatService
+
+logger = logging.getLogger(__name__)
+
+
+class ChatWriter:
+    def __init__(self, interval_ms: int, batch_size: int):
+        self.interval = interval_ms / 1000.0
+        self.batch_size = batch_size
+        self._pending: Dict[str, List[dict]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushing: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.written = 0
+
+    def enqueue(self, meeting_id: str, message: dict) -> None:
+
+        self._pending.setdefault(meeting_id, []).append(message)
+        if sum(len(m) for m in self._pending.values()) >= self.batch_size:
+            self._schedule(0)
+        elif self._timer is None:
+            self._schedule(self.interval)
+
+    def pending(self, meeting_id: str) -> List[dict]:
+
+        return list(self._pending.get(meeting_id, []))
+
+    def _schedule(self, delay: float) -> None:
+
+        if self._timer:
+            self._timer.cancel()
+        loop = asyncio.get_running_loop()
+        self._timer = loop.call_later(delay, self._start_flush)
+
+    def _start_flush(self) -> None:
+
+        self._timer = None
+        if self._flushing is None or self._flushing.done():
+            self._flushing = asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self) -> None:
+
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+
+        from app.services.meeting_cache import meeting_headers
+
+        try:
+            await ChatService(get_database()).insert_many(
+                [message for messages in batch.values() for message in messages]
+            )
+            self.flushes += 1
+            self.written += sum(len(m) for m in batch.values())
+        except Exception:
+            logger.exception("Failed to persist chat for %s meetings; retrying", len(batch))
+            for meeting_id, messages in batch.items():
+                self._pending[meeting_id] = messages + self._pending.get(meeting_id, [])
+            self._schedule(self.interval)
+            return
+
+        # A header read that started before this write may have missed these
+        # messages while they were no longer pending.
+        for meeting_id in batch:
+            meeting_headers.discard_inflight(meeting_id)
+
+        if self._pending and self._timer is None:
+            self._schedule(self.interval)
+
+    async def close(self) -> None:
+
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if self._flushing is not None:
+            await asyncio.gather(self._flushing, return_exceptions=True)
+        await self.flush()
+
+    def structures(self) -> Dict[str, object]:
+
+        return {"chat.pending": self._pending}
+
+
+chat_writer = ChatWriter(settings.CHAT_FLUSH_INTERVAL_MS, settings.CHAT_FLUSH_BATCH)
@@ -0,0 +1,130 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.db.models import MEETINGS_COLLECTION
+from app.services.chat_service import ChatService
+from app.services.chat_writer import chat_writer
+
+HISTORY_LIMIT = settings.CHAT_HISTORY_SIZE
+
+HEADER_PROJECTION = {
+    "_id": 0,
+    "meeting_id": 1,
+    "title": 1,
+    "status": 1,
+    "host": 1,
+    "settings": 1,
+    "archived": 1,
+}
+
+
+def host_id_of(host) -> Optional[str]:
+
+    if not host:
+        return None
+    if isinstance(host, dict):
+        return str(host.get("_id") or host.get("id"))
+    return str(host)
+
+
+def _header(doc: dict, messages: list) -> dict:
+
+    return {
+        "meeting_id": doc.get("meeting_id"),
+        "title": doc.get("title"),
+        "status": doc.get("status"),
+        "host_id": host_id_of(doc.get("host")),
+        "settings": doc.get("settings") or {},
+        "archived": bool(doc.get("archived")),
+        # Messages still waiting for the batched writer are not in the DB yet.
+        "messages": deque(
+            messages + chat_writer.pending(doc.get("meeting_id")),
+            maxlen=HISTORY_LIMIT
+        ),
+    }
+
+
+class MeetingHeaderCache:
+    def __init__(self, ttl: float, capacity: int):
+        self.ttl = ttl
+        self.capacity = capacity
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.loads = 0
+
+    async def get(self, db: AsyncIOMotorDatabase, meeting_id: str) -> Optional[dict]:
+
+        entry = self._entries.get(meeting_id)
+        if entry and entry[0] > time.monotonic():
+            self._entries.move_to_end(meeting_id)
+            self.hits += 1
+            return entry[1]
+
+        # Single flight: a join storm waits on the one read already in progress.
+        pending = self._loading.get(meeting_id)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[meeting_id] = future
+        try:
+            self.loads += 1
+            doc, messages = await asyncio.gather(
+                db[MEETINGS_COLLECTION].find_one({"meeting_id": meeting_id}, HEADER_PROJECTION),
+                ChatService(db).recent(meeting_id, HISTORY_LIMIT)
+            )
+            header = _header(doc, messages) if doc else None
+            # An invalidation while the read was in flight means it may be stale.
+            if header is not None and self._loading.get(meeting_id) is future:
+                self._store(meeting_id, header)
+            future.set_result(header)
+            return header
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            if self._loading.get(meeting_id) is future:
+                del self._loading[meeting_id]
+
+    def _store(self, meeting_id: str, header: dict) -> None:
+
+        self._entries[meeting_id] = (time.monotonic() + self.ttl, header)
+        self._entries.move_to_end(meeting_id)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def peek(self, meeting_id: str) -> Optional[dict]:
+
+        entry = self._entries.get(meeting_id)
+        return entry[1] if entry else None
+
+    def append_message(self, meeting_id: str, message: dict) -> None:
+
+        header = self.peek(meeting_id)
+        if header is None:
+            return
+        header["messages"].append(message)
+
+    def discard_inflight(self, meeting_id: str) -> None:
+
+        self._loading.pop(meeting_id, None)
+
+    def invalidate(self, meeting_id: str) -> None:
+
+        self._entries.pop(meeting_id, None)
+        self._loading.pop(meeting_id, None)
+
+    def structures(self) -> Dict[str, object]:
+
+        return {"meeting-headers": self._entries}
+
+
+meeting_headers = MeetingHeaderCache(settings.MEETING_CACHE_TTL_SECONDS, settings.MEETING_CACHE_SIZE)
@@ -1,7 +1,8 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List, Set, Tuple
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
 import uuid
 
 from app.db.models import MEETINGS_COLLECTION, USERS_COLLECTION
@@ -13,6 +14,20 @@ import asyncio
 import logging
 
 from app.core.cloudinary import upload_file as cloudinary_upload_file
+from app.services import transcript_service
+from app.services.archive_service import ArchiveService
+from app.services.chat_service import ChatService, page_messages
+from app.services.meeting_cache import HISTORY_LIMIT, meeting_headers
+from app.utils.io import get_io
+
+
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _read_text(path: str) -> str:
+
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
 
 
 class MeetingService:
@@ -45,7 +60,6 @@ class MeetingService:
             "end_time": None,
             "captions_text": None,
             "captions_file_path": None,
-            "messages": [],
             "created_at": datetime.utcnow()
         }
         
@@ -160,59 +174,53 @@ class MeetingService:
 
         return serialized
     
+    async def get_header(self, meeting_id: str) -> Optional[dict]:
+
+        return await meeting_headers.get(self.db, meeting_id)
+
     async def join_meeting(self, meeting_id: str, user_id: str) -> Optional[dict]:
         
-        meeting = await self.collection.find_one({"meeting_id": meeting_id})
-        
-        if not meeting:
-            return None
-        
-        if meeting["status"] == "ended":
-            return None
-     
-        existing_participant = None
-        for p in meeting.get("participants", []):
-            if p.get("user") == user_id:
-                existing_participant = p
-                break
-        
-        if existing_participant:
-   
-            await self.collection.update_one(
-                {"meeting_id": meeting_id, "participants.user": user_id},
-                {
-                    "$set": {
-                        "participants.$.is_active": True,
-                        "participants.$.joined_at": datetime.utcnow(),
-                        "participants.$.left_at": None
-                    }
+        now = datetime.utcnow()
+        meeting = await self.collection.find_one_and_update(
+            {"meeting_id": meeting_id, "status": {"$ne": "ended"}, "participants.user": user_id},
+            {
+                "$set": {
+                    "participants.$.is_active": True,
+                    "participants.$.joined_at": now,
+                    "participants.$.left_at": None
                 }
-            )
-        else:
+            },
+            return_document=True
+        )
+
+        if not meeting:
 
             participant = {
                 "user": user_id,
-                "joined_at": datetime.utcnow(),
+                "joined_at": now,
                 "left_at": None,
                 "is_active": True
             }
-            
-            update_data = {"$push": {"participants": participant}}
-            
-       
-            if meeting["host"] == user_id and meeting["status"] == "scheduled":
-                update_data["$set"] = {
-                    "status": "active",
-                    "start_time": datetime.utcnow()
-                }
-            
-            await self.collection.update_one(
-                {"meeting_id": meeting_id},
-                update_data
+
+            meeting = await self.collection.find_one_and_update(
+                {"meeting_id": meeting_id, "status": {"$ne": "ended"}, "participants.user": {"$ne": user_id}},
+                {"$push": {"participants": participant}},
+                return_document=True
             )
-   
-        updated_meeting = await self.collection.find_one({"meeting_id": meeting_id})
-        return self._serialize_meeting(updated_meeting)
+
+            if meeting and meeting.get("host") == user_id and meeting.get("status") == "scheduled":
+                started = await self.collection.find_one_and_update(
+                    {"meeting_id": meeting_id, "status": "scheduled"},
+                    {"$set": {"status": "active", "start_time": now}},
+                    return_document=True
+                )
+                if started:
+                    meeting = started
+                    meeting_headers.invalidate(meeting_id)
+
+        if not meeting:
+            return None
+        return self._serialize_meeting(meeting)
     
     async def leave_meeting(self, meeting_id: str, user_id: str) -> bool:
        
@@ -228,6 +236,41 @@ class MeetingService:
         
         return result.modified_count > 0
     
+    async def write_presence(self, changes: Dict[Tuple[str, Optional[str]], dict]) -> int:
+
+        # Keys are (meeting, user) with the participant fields to set, or
+        # (meeting, None) to mark everyone in an ended meeting inactive.
+        operations = []
+        for (meeting_id, user_id), fields in changes.items():
+            if user_id is None:
+                operations.append(UpdateOne(
+                    {"meeting_id": meeting_id},
+                    {"$set": {f"participants.$[p].{k}": v for k, v in fields.items()}},
+                    array_filters=[{"p.is_active": True}]
+                ))
+            else:
+                operations.append(UpdateOne(
+                    {"meeting_id": meeting_id, "participants.user": user_id},
+                    {"$set": {f"participants.$.{k}": v for k, v in fields.items()}}
+                ))
+        if not operations:
+            return 0
+        result = await self.collection.bulk_write(operations, ordered=False)
+        return result.modified_count
+
+    async def active_participants(self) -> List[Tuple[str, str]]:
+
+        cursor = self.collection.find(
+            {"status": {"$ne": "ended"}, "participants.is_active": True},
+            {"meeting_id": 1, "participants.user": 1, "participants.is_active": 1}
+        )
+        active = []
+        async for meeting in cursor:
+            for participant in meeting.get("participants", []):
+                if participant.get("is_active") and participant.get("user"):
+                    active.append((meeting["meeting_id"], participant["user"]))
+        return active
+
     async def update_meeting(self, meeting_id: str, meeting_data: MeetingUpdate) -> Optional[dict]:
    
         update_dict = meeting_data.model_dump(exclude_unset=True)
@@ -244,12 +287,13 @@ class MeetingService:
             {"$set": update_dict},
             return_document=True
         )
+        meeting_headers.invalidate(meeting_id)
         
         if result:
             return self._serialize_meeting(result)
         return None
     
-    async def end_meeting(self, meeting_id: str) -> Optional[dict]:
+    async def end_meeting(self, meeting_id: str, recipients: Optional[List[str]] = None) -> Optional[dict]:
      
         result = await self.collection.find_one_and_update(
             {"meeting_id": meeting_id},
@@ -261,49 +305,71 @@ class MeetingService:
             },
             return_document=True
         )
+        meeting_headers.invalidate(meeting_id)
         
         if result:
+            transcript_path = transcript_service.seal(meeting_id)
+            task = asyncio.create_task(self._publish_transcript(meeting_id, transcript_path, recipients))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+            return self._serialize_meeting(result)
+        return None
+
+    async def _publish_transcript(self, meeting_id: str, transcript_path: Optional[str], recipients: Optional[List[str]] = None) -> None:
+
+        from app.services.caption_service import CaptionService
+
+        built_path = None
+        try:
+            if not transcript_path:
+                caption_service = CaptionService(self.db)
+                if not await caption_service.captions_exist(meeting_id):
+                    return
+                fd, built_path = tempfile.mkstemp(suffix=".txt", prefix="captions_")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    async for line in caption_service.stream_captions(meeting_id, "txt"):
+                        f.write(line)
+                transcript_path = built_path
+
+            formatted = await asyncio.to_thread(_read_text, transcript_path)
+            if not formatted:
+                return
+
+            update = {"captions_text": formatted}
+            extra = {"resource_type": "raw", "folder": "captions", "use_filename": True, "unique_filename": True}
             try:
-                from app.services.caption_service import CaptionService
-                db = self.db
-                caption_service = CaptionService(db)
-                caps = await caption_service.get_captions(meeting_id)
-                if caps and caps.get("captions"):
-                    formatted = caption_service.format_captions(caps.get("captions", []), format="txt")
-
-                    tmp_fd = None
-                    tmp_path = None
-                    try:
-                        import tempfile, os
-                        fd, tmp_path = tempfile.mkstemp(suffix=".txt", prefix="captions_")
-                        tmp_fd = fd
-                        with os.fdopen(fd, "w", encoding="utf-8") as f:
-                            f.write(formatted)
-
-                        from app.core.cloudinary import upload_file as cloudinary_upload_file
-                        extra = {"resource_type": "raw", "folder": "captions", "use_filename": True, "unique_filename": True}
-                        try:
-                            upload_res = await asyncio.to_thread(cloudinary_upload_file, tmp_path, None, None, extra)
-                            url = upload_res.get("secure_url") or upload_res.get("url")
-                            if url:
-                                await self.collection.update_one({"meeting_id": meeting_id}, {"$set": {"captions_text": formatted, "captions_file_path": url}})
-                        except Exception:
-                       
-                            await self.collection.update_one({"meeting_id": meeting_id}, {"$set": {"captions_text": formatted}})
-                    finally:
-                        try:
-                            if tmp_path and os.path.exists(tmp_path):
-                                os.remove(tmp_path)
-                        except Exception:
-                            pass
+                upload_res = await asyncio.to_thread(cloudinary_upload_file, transcript_path, None, None, extra)
+                url = upload_res.get("secure_url") or upload_res.get("url")
+                if url:
+                    update["captions_file_path"] = url
+            except Exception:
+                logging.exception("Failed to upload captions for meeting %s", meeting_id)
+
+            await self.collection.update_one({"meeting_id": meeting_id}, {"$set": update})
+            transcript_service.discard(meeting_id)
+
+            io = get_io()
+            if io:
+                await io.emit(
+                    "captions-ready",
+                    {
+                        "meetingId": meeting_id,
+                        "captionsFilePath": update.get("captions_file_path"),
+                        "captionsText": formatted,
+                    },
+                    # The meeting room may already be closed by the time
+                    # the upload finishes, so address the sockets directly.
+                    to=recipients or meeting_id,
+                )
+        except Exception:
+            logging.exception("Failed to publish transcript for meeting %s", meeting_id)
+        finally:
+            try:
+                if built_path and os.path.exists(built_path):
+                    os.remove(built_path)
             except Exception:
-
                 pass
 
-            updated = await self.collection.find_one({"meeting_id": meeting_id})
-            return self._serialize_meeting(updated)
-        return None
-
     async def add_user_in_meeting(self, meeting_id: str, user_id: str) -> Optional[dict]:
     
         meeting = await self.collection.find_one({"meeting_id": meeting_id})
@@ -469,54 +535,67 @@ class MeetingService:
         return None
 
     async def get_meeting_captions_text(self, meeting_id: str) -> Optional[str]:
-        meeting = await self.collection.find_one({"meeting_id": meeting_id})
+        meeting = await self.collection.find_one({"meeting_id": meeting_id}, {"captions_text": 1, "archived": 1})
         if not meeting:
             return None
+        if meeting.get("archived"):
+            archive = await ArchiveService(self.db).load(meeting_id)
+            return archive.get("captions_text") if archive else None
         return meeting.get("captions_text")
     
     async def delete_meeting(self, meeting_id: str) -> bool:
        
         result = await self.collection.delete_one({"meeting_id": meeting_id})
+        meeting_headers.invalidate(meeting_id)
+        if result.deleted_count:
+            await ChatService(self.db).delete_for_meeting(meeting_id)
         return result.deleted_count > 0
     
     async def add_chat_message(self, meeting_id: str, user_id: str, text: str) -> bool:
     
+        if not await self.get_header(meeting_id):
+            return False
+
         user = await self.users_collection.find_one({"_id": ObjectId(user_id)})
-        
-        message = {
-            "sender": user_id,
-            "sender_name": user["name"] if user else "Unknown",
-            "text": text,
-            "timestamp": datetime.utcnow()
-        }
-        
-        result = await self.collection.update_one(
-            {"meeting_id": meeting_id},
-            {"$push": {"messages": message}}
+        message = await ChatService(self.db).add_message(
+            meeting_id,
+            user_id,
+            user["name"] if user else "Unknown",
+            text
         )
+        meeting_headers.append_message(meeting_id, message)
         
-        return result.modified_count > 0
+        return True
     
-    async def get_chat_history(self, meeting_id: str, limit: int = 100) -> List[dict]:
+    async def get_chat_history(self, meeting_id: str, limit: int = 100, before: Optional[str] = None) -> dict:
        
-        meeting = await self.collection.find_one(
-            {"meeting_id": meeting_id},
-            {"messages": {"$slice": -limit}}
-        )
-        
-        if not meeting:
-            return []
-        
-        messages = meeting.get("messages", [])
-        return [
+        # Active meetings keep their recent chat in memory, including
+        # messages the batched writer has not persisted yet.
+        header = meeting_headers.peek(meeting_id)
+        if header is not None and not before and limit <= HISTORY_LIMIT:
+            messages = list(header["messages"])
+            page = page_messages(messages, None, limit, complete=len(messages) < HISTORY_LIMIT)
+        else:
+            header = await self.get_header(meeting_id)
+            if not header:
+                return {"messages": [], "next_cursor": None}
+            if header.get("archived"):
+                archive = await ArchiveService(self.db).load(meeting_id)
+                page = page_messages(archive.get("messages", []) if archive else [], before, limit)
+            else:
+                page = await ChatService(self.db).page(meeting_id, before, limit)
+
+        page["messages"] = [
             {
+                "id": str(m["_id"]) if m.get("_id") else None,
                 "sender_id": str(m.get("sender")),
-                "sender_name": m.get("sender_name", "Unknown"),
+                "sender_name": m.get("sender_name") or m.get("senderName") or "Unknown",
                 "text": m.get("text"),
                 "timestamp": m.get("timestamp").isoformat() if m.get("timestamp") else None
             }
-            for m in messages
+            for m in page["messages"]
         ]
+        return page
     
     def _serialize_meeting(self, meeting: dict) -> dict:
        
@@ -575,7 +654,6 @@ class MeetingService:
             "captions_text": meeting.get("captions_text"),
             "captionsFilePath": meeting.get("captions_file_path"),
             "captions_file_path": meeting.get("captions_file_path"),
-            "messages": meeting.get("messages", []),
             "createdAt": _fmt(meeting.get("created_at")),
             "created_at": _fmt(meeting.get("created_at"))
         }
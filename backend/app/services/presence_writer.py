@@ -0,0 +1,147 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.db.base import get_database
+from app.services.meeting_service import MeetingService
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, Optional[str]]
+
+
+class PresenceWriter:
+    def __init__(self, interval_ms: int, batch_size: int):
+        self.interval = interval_ms / 1000.0
+        self.batch_size = batch_size
+        # Latest participant fields per (meeting, user); (meeting, None)
+        # marks everyone in an ended meeting inactive.
+        self._pending: Dict[Key, dict] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushing: Optional[asyncio.Task] = None
+        # Participants Mongo still had active at startup who have not rejoined.
+        self._unconfirmed: Set[Tuple[str, str]] = set()
+        self.flushes = 0
+        self.written = 0
+        self.coalesced = 0
+
+    def joined(self, meeting_id: str, user_id: str) -> None:
+
+        self._unconfirmed.discard((meeting_id, user_id))
+        self._set((meeting_id, user_id), {"is_active": True, "joined_at": datetime.utcnow(), "left_at": None})
+
+    def left(self, meeting_id: str, user_id: str) -> None:
+
+        self._set((meeting_id, user_id), {"is_active": False, "left_at": datetime.utcnow()})
+
+    def ended(self, meeting_id: str) -> None:
+
+        # Bulk writes are unordered, so a queued join must not race the
+        # meeting-wide update.
+        for key in [k for k, f in self._pending.items() if k[0] == meeting_id and f.get("is_active")]:
+            del self._pending[key]
+        self._set((meeting_id, None), {"is_active": False, "left_at": datetime.utcnow()})
+
+    def _set(self, key: Key, fields: dict) -> None:
+
+        existing = self._pending.get(key)
+        if existing is not None:
+            existing.update(fields)
+            self.coalesced += 1
+        else:
+            self._pending[key] = fields
+        if len(self._pending) >= self.batch_size:
+            self._schedule(0)
+        elif self._timer is None:
+            self._schedule(self.interval)
+
+    def _schedule(self, delay: float) -> None:
+
+        if self._timer:
+            self._timer.cancel()
+        loop = asyncio.get_running_loop()
+        self._timer = loop.call_later(delay, self._start_flush)
+
+    def _start_flush(self) -> None:
+
+        self._timer = None
+        if self._flushing is None or self._flushing.done():
+            self._flushing = asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self) -> None:
+
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+
+        try:
+            await MeetingService(get_database()).write_presence(batch)
+            self.flushes += 1
+            self.written += len(batch)
+        except Exception:
+            logger.exception("Failed to persist presence for %s participants; retrying", len(batch))
+            # Changes queued since the failed batch are newer and win.
+            for key, fields in batch.items():
+                newer = self._pending.get(key)
+                self._pending[key] = dict(fields, **newer) if newer else fields
+            self._schedule(self.interval)
+            return
+
+        if self._pending and self._timer is None:
+            self._schedule(self.interval)
+
+    async def restore(self, is_connected: Callable[[str, str], Awaitable], grace_seconds: float) -> None:
+
+        # Sockets do not survive a restart, so whoever Mongo still lists as
+        # active gets the grace period to reconnect before being marked gone.
+        try:
+            active = await MeetingService(get_database()).active_participants()
+        except Exception:
+            logger.exception("Failed to load active participants for presence restore")
+            return
+        if not active:
+            return
+        self._unconfirmed.update(active)
+        logger.info("Restoring presence for %s participants; waiting %ss for reconnects", len(active), grace_seconds)
+
+        await asyncio.sleep(grace_seconds)
+        stale, self._unconfirmed = self._unconfirmed, set()
+        gone = 0
+        for meeting_id, user_id in stale:
+            try:
+                if await is_connected(meeting_id, user_id):
+                    continue
+            except Exception:
+                logger.exception("Failed to check presence of %s in %s", user_id, meeting_id)
+                continue
+            self.left(meeting_id, user_id)
+            gone += 1
+        logger.info("Presence restore: %s of %s participants did not reconnect", gone, len(active))
+
+    async def close(self) -> None:
+
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if self._flushing is not None:
+            await asyncio.gather(self._flushing, return_exceptions=True)
+        await self.flush()
+
+    def structures(self) -> Dict[str, object]:
+
+        return {"presence.pending-writes": self._pending, "presence.unconfirmed": self._unconfirmed}
+
+    def stats(self) -> dict:
+
+        return {
+            "pending": len(self._pending),
+            "unconfirmed": len(self._unconfirmed),
+            "flushes": self.flushes,
+            "written": self.written,
+            "coalesced": self.coalesced,
+        }
+
+
+presence_writer = PresenceWriter(settings.PRESENCE_FLUSH_INTERVAL_MS, settings.PRESENCE_FLUSH_BATCH)
@@ -0,0 +1,150 @@
+import re
+from datetime import datetime
+from typing import List, Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.db.models import MEETINGS_COLLECTION, USERS_COLLECTION, CAPTION_SEGMENTS_COLLECTION, CHAT_MESSAGES_COLLECTION
+
+
+SEARCH_SOURCES = ("captions", "chat")
+MAX_SEARCH_RESULTS = 100
+
+
+def _fmt(dt) -> Optional[str]:
+
+    if not isinstance(dt, datetime):
+        return None
+    if dt.tzinfo is None:
+        return dt.isoformat() + "Z"
+    return dt.isoformat()
+
+
+def _object_id(value: str):
+
+    try:
+        return ObjectId(value)
+    except Exception:
+        return value
+
+
+def _terms(query: str) -> List[str]:
+
+    return [t for t in re.split(r"\W+", query.lower()) if t]
+
+
+class SearchService:
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.meetings = db[MEETINGS_COLLECTION]
+        self.segments = db[CAPTION_SEGMENTS_COLLECTION]
+        self.chat = db[CHAT_MESSAGES_COLLECTION]
+
+    async def search(
+        self,
+        user_id: str,
+        query: str,
+        skip: int = 0,
+        limit: int = 20,
+        sources: Optional[List[str]] = None
+    ) -> dict:
+
+        terms = _terms(query)
+        if not terms:
+            return {"results": [], "has_more": False}
+
+        sources = [s for s in (sources or SEARCH_SOURCES) if s in SEARCH_SOURCES]
+        limit = min(limit, MAX_SEARCH_RESULTS)
+        window = skip + limit + 1
+
+        titles = await self._visible_meetings(user_id)
+        if not titles:
+            return {"results": [], "has_more": False}
+
+        hits = []
+        if "captions" in sources:
+            hits.extend(await self._search_captions(query, titles, window))
+        if "chat" in sources:
+            hits.extend(await self._search_chat(query, titles, window))
+
+        hits.sort(key=lambda h: (h["score"], h["timestamp"] or ""), reverse=True)
+        page = hits[skip:skip + limit]
+        return {"results": page, "has_more": len(hits) > skip + limit}
+
+    async def _visible_meetings(self, user_id: str) -> dict:
+
+        hidden = []
+        user_doc = await self.db[USERS_COLLECTION].find_one({"_id": _object_id(user_id)}, {"hidden_meetings": 1})
+        if user_doc:
+            hidden = user_doc.get("hidden_meetings", []) or []
+
+        cursor = self.meetings.find(
+            {
+                "$or": [{"host": user_id}, {"participants.user": user_id}],
+                "meeting_id": {"$nin": hidden},
+            },
+            {"meeting_id": 1, "title": 1}
+        )
+        return {m["meeting_id"]: m.get("title") async for m in cursor}
+
+    async def _search_captions(self, query: str, titles: dict, window: int) -> List[dict]:
+
+        cursor = self.segments.find(
+            {"$text": {"$search": query}, "meeting_id": {"$in": list(titles)}},
+            {
+                "_id": 0,
+                "meeting_id": 1,
+                "seq": 1,
+                "speaker": 1,
+                "speaker_name": 1,
+                "original_text": 1,
+                "timestamp": 1,
+                "score": {"$meta": "textScore"},
+            }
+        ).sort([("score", {"$meta": "textScore"})]).limit(window)
+
+        hits = []
+        async for seg in cursor:
+            hits.append({
+                "type": "caption",
+                "meetingId": seg["meeting_id"],
+                "meetingTitle": titles.get(seg["meeting_id"]),
+                "speakerId": seg.get("speaker"),
+                "speakerName": seg.get("speaker_name"),
+                "text": seg.get("original_text"),
+                "timestamp": _fmt(seg.get("timestamp")),
+                "seq": seg.get("seq"),
+                "score": seg.get("score", 0.0),
+            })
+        return hits
+
+    async def _search_chat(self, query: str, titles: dict, window: int) -> List[dict]:
+
+        cursor = self.chat.find(
+            {"$text": {"$search": query}, "meeting_id": {"$in": list(titles)}},
+            {
+                "_id": 0,
+                "meeting_id": 1,
+                "sender": 1,
+                "sender_name": 1,
+                "text": 1,
+                "timestamp": 1,
+                "score": {"$meta": "textScore"},
+            }
+        ).sort([("score", {"$meta": "textScore"})]).limit(window)
+
+        hits = []
+        async for m in cursor:
+            hits.append({
+                "type": "chat",
+                "meetingId": m["meeting_id"],
+                "meetingTitle": titles.get(m["meeting_id"]),
+                "speakerId": str(m.get("sender")) if m.get("sender") else None,
+                "speakerName": m.get("sender_name"),
+                "text": m.get("text"),
+                "timestamp": _fmt(m.get("timestamp")),
+                "seq": None,
+                "score": m.get("score", 0.0),
+            })
+        return hits
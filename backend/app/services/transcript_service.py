@@ -0,0 +1,68 @@
+import logging
+import os
+from typing import Dict, IO, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_open_transcripts: Dict[str, IO[str]] = {}
+
+
+def transcript_path(meeting_id: str) -> str:
+
+    return os.path.join(settings.TRANSCRIPT_DIR, f"{meeting_id}.txt")
+
+
+def append_line(meeting_id: str, line: str) -> None:
+
+    handle = _open_transcripts.get(meeting_id)
+    try:
+        if handle is None:
+            os.makedirs(settings.TRANSCRIPT_DIR, exist_ok=True)
+            handle = open(transcript_path(meeting_id), "a", encoding="utf-8")
+            _open_transcripts[meeting_id] = handle
+        handle.write(line)
+        handle.flush()
+    except Exception:
+        logger.exception("Failed to append transcript line for meeting %s", meeting_id)
+
+
+def release(meeting_id: str) -> None:
+
+    # Closes the handle but keeps the file; a later line reopens it in
+    # append mode and seal() still finds everything written so far.
+    handle = _open_transcripts.pop(meeting_id, None)
+    if handle is not None:
+        try:
+            handle.close()
+        except Exception:
+            logger.exception("Failed to close transcript for meeting %s", meeting_id)
+
+
+def seal(meeting_id: str) -> Optional[str]:
+
+    release(meeting_id)
+    path = transcript_path(meeting_id)
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        return path
+    return None
+
+
+def discard(meeting_id: str) -> None:
+
+    seal(meeting_id)
+    try:
+        os.remove(transcript_path(meeting_id))
+    except FileNotFoundError:
+        pass
+    except Exception:
+        logger.exception("Failed to remove transcript for meeting %s", meeting_id)
+
+
+def structures() -> Dict[str, object]:
+
+    return {"transcripts.open": _open_transcripts}
+
+
+__all__ = ["transcript_path", "append_line", "release", "seal", "discard", "structures"]
@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.db.models import TRANSLATION_CACHE_COLLECTION
+
+logger = logging.getLogger(__name__)
+
+Pair = Tuple[str, str]
+
+
+def _cache_key(text: str, source: str, target: str) -> str:
+
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    return f"{source}:{target}:{digest}"
+
+
+class TranslationService:
+    def __init__(self, db: Optional[AsyncIOMotorDatabase] = None):
+        self.cache = db[TRANSLATION_CACHE_COLLECTION] if db is not None else None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lru: "OrderedDict[str, str]" = OrderedDict()
+        self._pending: Dict[Pair, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[Pair, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.requests = 0
+        self.cache_hits = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=settings.TRANSLATION_TIMEOUT_SECONDS,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+                headers={"User-Agent": "wwc-captions-service/1.0"},
+            )
+        return self._client
+
+    async def translate(self, text: str, source: str, target: str) -> Optional[str]:
+
+        if not text or source == target:
+            return text
+
+        key = _cache_key(text, source, target)
+        cached = self._lru.get(key)
+        if cached is not None:
+            self._lru.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+
+        pair = (source, target)
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.setdefault(pair, [])
+        batch.append((text, future))
+
+        if len(batch) >= settings.TRANSLATION_MAX_BATCH:
+            self._schedule_flush(pair, 0)
+        elif pair not in self._timers:
+            self._schedule_flush(pair, settings.TRANSLATION_BATCH_WINDOW_MS / 1000.0)
+
+        return await future
+
+    def _schedule_flush(self, pair: Pair, delay: float) -> None:
+
+        timer = self._timers.pop(pair, None)
+        if timer:
+            timer.cancel()
+        self._timers[pair] = asyncio.get_running_loop().call_later(delay, self._start_flush, pair)
+
+    def _start_flush(self, pair: Pair) -> None:
+
+        task = asyncio.get_running_loop().create_task(self._flush(pair))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, pair: Pair) -> None:
+
+        self._timers.pop(pair, None)
+        batch = self._pending.pop(pair, [])
+        if not batch:
+            return
+
+        source, target = pair
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        results: Dict[str, Optional[str]] = {}
+
+        try:
+            keys = {text: _cache_key(text, source, target) for text in texts}
+            if self.cache is not None:
+                async for doc in self.cache.find({"_id": {"$in": list(keys.values())}}):
+                    results[doc["text"]] = doc["translation"]
+                self.cache_hits += len(results)
+
+            missing = [text for text in texts if text not in results]
+            if missing:
+                translated = await self._request(missing, source, target)
+                results.update(translated)
+                if self.cache is not None and translated:
+                    await self.cache.bulk_write([
+                        UpdateOne(
+                            {"_id": keys[text]},
+                            {"$set": {"text": text, "translation": value, "source": source, "target": target}},
+                            upsert=True
+                        )
+                        for text, value in translated.items()
+                    ], ordered=False)
+
+            for text, value in results.items():
+                if value is not None:
+                    self._remember(keys[text], value)
+        except Exception:
+            logger.exception("Translation batch %s->%s failed", source, target)
+
+        for text, future in batch:
+            if not future.done():
+                future.set_result(results.get(text))
+
+    async def _request(self, texts: List[str], source: str, target: str) -> Dict[str, str]:
+
+        payload = {"q": texts, "source": source, "target": target, "format": "text"}
+        if settings.LIBRETRANSLATE_API_KEY:
+            payload["api_key"] = settings.LIBRETRANSLATE_API_KEY
+
+        self.requests += 1
+        resp = await self._get_client().post(settings.LIBRETRANSLATE_URL, json=payload)
+        resp.raise_for_status()
+        translated = resp.json().get("translatedText")
+        if isinstance(translated, str):
+            translated = [translated]
+        return {text: value for text, value in zip(texts, translated or [])}
+
+    def _remember(self, key: str, value: str) -> None:
+
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > settings.TRANSLATION_CACHE_SIZE:
+            self._lru.popitem(last=False)
+
+    async def aclose(self) -> None:
+
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_translation_service: Optional[TranslationService] = None
+
+
+def get_translation_service() -> TranslationService:
+
+    global _translation_service
+    if _translation_service is None:
+        from app.db.base import get_database
+        _translation_service = TranslationService(get_database())
+    return _translation_service
+
+
+async def close_translation_service() -> None:
+
+    global _translation_service
+    if _translation_service is not None:
+        await _translation_service.aclose()
+        _translation_service = None
@@ -0,0 +1,190 @@
+import asyncio
+import functools
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Set
+
+from app.sockets.caption_buffer import CaptionRingBuffer
+from app.sockets.hash_ring import HashRing
+
+_STOP = object()
+
+
+class MeetingRuntime:
+    __slots__ = ("meeting_id", "sids", "captions", "subscribers", "batch_sids", "presence_sids")
+
+    def __init__(self, meeting_id: str, caption_capacity: int):
+        self.meeting_id = meeting_id
+        # Sockets of this meeting connected to this process.
+        self.sids: Set[str] = set()
+        self.captions = CaptionRingBuffer(caption_capacity)
+        self.subscribers: Dict[str, Set[str]] = {}
+        self.batch_sids: Set[str] = set()
+        self.presence_sids: Set[str] = set()
+
+
+class MeetingActor:
+    def __init__(self, runtime: MeetingRuntime, idle_seconds: float, on_idle: Callable[["MeetingActor"], None]):
+        self.runtime = runtime
+        self.idle = idle_seconds
+        self.on_idle = on_idle
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+        self.processed = 0
+
+    def _ensure_running(self) -> None:
+
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def call(self, fn: Callable[..., Awaitable], *args):
+
+        # Work already running on this actor (end-meeting tearing down its
+        # sockets, say) must not queue behind itself.
+        if self.task is not None and asyncio.current_task() is self.task:
+            return await fn(*args)
+
+        future = asyncio.get_running_loop().create_future()
+        self.inbox.put_nowait((fn, args, future))
+        self._ensure_running()
+        return await future
+
+    def stop(self) -> None:
+
+        self.inbox.put_nowait((_STOP, (), None))
+
+    async def _run(self) -> None:
+
+        while True:
+            try:
+                fn, args, future = await asyncio.wait_for(self.inbox.get(), self.idle)
+            except asyncio.TimeoutError:
+                # Idle actors release their task; the next call starts a new one.
+                if self.inbox.empty():
+                    self.on_idle(self)
+                    return
+                continue
+
+            if fn is _STOP:
+                return
+            if future.cancelled():
+                continue
+            try:
+                result = await fn(*args)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            self.processed += 1
+
+
+class ActorRegistry:
+    def __init__(self, caption_capacity: int, idle_seconds: float, nodes: Iterable[str] = (), node_id: str = ""):
+        self.caption_capacity = caption_capacity
+        self.idle = idle_seconds
+        self.ring = HashRing(nodes)
+        self.node_id = node_id
+        self.actors: Dict[str, MeetingActor] = {}
+
+    def actor(self, meeting_id: str) -> MeetingActor:
+
+        actor = self.actors.get(meeting_id)
+        if actor is None:
+            actor = self.actors[meeting_id] = MeetingActor(
+                MeetingRuntime(meeting_id, self.caption_capacity),
+                self.idle,
+                self._idle
+            )
+        return actor
+
+    def runtime(self, meeting_id: str) -> MeetingRuntime:
+
+        return self.actor(meeting_id).runtime
+
+    def peek(self, meeting_id: str) -> Optional[MeetingRuntime]:
+
+        actor = self.actors.get(meeting_id)
+        return actor.runtime if actor else None
+
+    def owner(self, meeting_id: str) -> Optional[str]:
+
+        return self.ring.node_for(meeting_id) or self.node_id or None
+
+    def owns(self, meeting_id: str) -> bool:
+
+        owner = self.ring.node_for(meeting_id)
+        return owner is None or owner == self.node_id
+
+    async def call(self, meeting_id: str, fn: Callable[..., Awaitable], *args):
+
+        return await self.actor(meeting_id).call(fn, *args)
+
+    def _idle(self, actor: MeetingActor) -> None:
+
+        # Runtime left behind with no local sockets (late captions after a
+        # teardown, say) goes away with the idle task.
+        meeting_id = actor.runtime.meeting_id
+        if not actor.runtime.sids and self.actors.get(meeting_id) is actor:
+            del self.actors[meeting_id]
+
+    def drop(self, meeting_id: str, force: bool = True) -> Optional[MeetingRuntime]:
+
+        # Work queued before the drop still runs; later calls get a fresh actor.
+        # Without force an actor with queued work (a join racing the last
+        # leave) is kept.
+        actor = self.actors.get(meeting_id)
+        if actor is None or (not force and not actor.inbox.empty()):
+            return None
+        del self.actors[meeting_id]
+        actor.stop()
+        return actor.runtime
+
+    def serialize(
+        self,
+        events: Iterable[str],
+        resolve: Callable[[str, str, object], Awaitable[Optional[str]]],
+        foreign: Optional[Callable[[str, str, str], Awaitable[bool]]] = None
+    ):
+
+        events = frozenset(events)
+
+        def layer(event: str, handler):
+            if event not in events:
+                return handler
+
+            @functools.wraps(handler)
+            async def serialized(sid, *args):
+                meeting_id = await resolve(event, sid, args[0] if args else None)
+                if not meeting_id:
+                    return await handler(sid, *args)
+                if not self.owns(meeting_id):
+                    # Meetings owned by another node never get an actor here;
+                    # foreign() turns away the events it should not serve.
+                    if foreign is not None and await foreign(event, sid, meeting_id):
+                        return None
+                    return await handler(sid, *args)
+                return await self.call(meeting_id, handler, sid, *args)
+
+            return serialized
+
+        return layer
+
+    async def close(self) -> None:
+
+        tasks = []
+        for meeting_id in list(self.actors):
+            task = self.actors[meeting_id].task
+            self.drop(meeting_id)
+            if task is not None and not task.done():
+                tasks.append(task)
+        if tasks:
+            await asyncio.wait(tasks, timeout=5)
+
+    def stats(self) -> dict:
+
+        return {
+            "node": self.node_id or None,
+            "actors": len(self.actors),
+            "running": sum(1 for a in self.actors.values() if a.task is not None and not a.task.done()),
+            "queued": sum(a.inbox.qsize() for a in self.actors.values()),
+        }
@@ -0,0 +1,132 @@
+import asyncio
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Optional, Tuple
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+ENCODING = "pcm16"
+SEQ_BYTES = 4
+SEQ_MODULO = 1 << 32
+# A backlog is merged into chunks of at most this many chunk lengths.
+MAX_MERGED_CHUNKS = 4
+
+
+def bytes_for_ms(ms: int) -> int:
+
+    return SAMPLE_RATE * SAMPLE_WIDTH * ms // 1000
+
+
+def parse_frame(data) -> Optional[Tuple[int, memoryview]]:
+
+    # Frames are a little-endian uint32 sequence number followed by raw
+    # 16 kHz mono PCM16 samples; nothing else is repeated per frame.
+    if not isinstance(data, (bytes, bytearray, memoryview)) or len(data) <= SEQ_BYTES:
+        return None
+    view = memoryview(data)
+    pcm = view[SEQ_BYTES:]
+    if len(pcm) % SAMPLE_WIDTH:
+        return None
+    return int.from_bytes(view[:SEQ_BYTES], "little"), pcm
+
+
+class AudioStream:
+    __slots__ = (
+        "meeting_id", "speaker_id", "speaker_name", "language", "translate",
+        "chunk_bytes", "max_gap_bytes", "next_seq", "buffer", "consumed",
+        "started_at", "frames", "gaps", "lost_frames", "late_frames",
+        "max_pending", "pending", "consumer", "merged_chunks", "dropped_chunks",
+    )
+
+    def __init__(
+        self,
+        meeting_id: str,
+        speaker_id: Optional[str],
+        speaker_name: str,
+        language: Optional[str],
+        translate: bool,
+        chunk_ms: int,
+        max_gap_ms: int,
+        max_pending: int,
+    ):
+        self.meeting_id = meeting_id
+        self.speaker_id = speaker_id
+        self.speaker_name = speaker_name
+        self.language = language
+        self.translate = translate
+        self.chunk_bytes = bytes_for_ms(chunk_ms)
+        self.max_gap_bytes = bytes_for_ms(max_gap_ms)
+        self.next_seq = 0
+        self.buffer = bytearray()
+        self.consumed = 0
+        self.started_at = datetime.utcnow()
+        self.frames = 0
+        self.gaps = 0
+        self.lost_frames = 0
+        self.late_frames = 0
+        # Chunks waiting for transcription, drained in order by one consumer task.
+        self.max_pending = max(1, max_pending)
+        self.pending: Deque[Tuple[bytes, datetime]] = deque()
+        self.consumer: Optional[asyncio.Task] = None
+        self.merged_chunks = 0
+        self.dropped_chunks = 0
+
+    def push(self, seq: int, pcm: memoryview) -> int:
+
+        # Returns how many frames were missing before this one (0 when in order, -1 when late).
+        missing = (seq - self.next_seq) % SEQ_MODULO
+        if missing >= SEQ_MODULO // 2:
+            self.late_frames += 1
+            return -1
+
+        if missing:
+            self.gaps += 1
+            self.lost_frames += missing
+            # Pad with silence so caption offsets stay aligned with real time.
+            silence = min(missing * len(pcm), self.max_gap_bytes)
+            self.buffer.extend(bytes(silence - silence % SAMPLE_WIDTH))
+
+        self.buffer.extend(pcm)
+        self.frames += 1
+        self.next_seq = (seq + 1) % SEQ_MODULO
+        return missing
+
+    def take_chunk(self, final: bool = False) -> Optional[Tuple[bytes, datetime]]:
+
+        if len(self.buffer) < self.chunk_bytes and not (final and self.buffer):
+            return None
+        size = len(self.buffer) if final else self.chunk_bytes
+        chunk = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        started = self.started_at + timedelta(seconds=self.consumed / (SAMPLE_RATE * SAMPLE_WIDTH))
+        self.consumed += size
+        return chunk, started
+
+    def enqueue(self, chunk: bytes, started: datetime) -> None:
+
+        self.pending.append((chunk, started))
+        # When transcription falls behind, the oldest chunks are merged so the
+        # backlog costs fewer calls; once merged chunks are at their limit the
+        # oldest audio is dropped instead of buffering without bound.
+        while len(self.pending) > self.max_pending:
+            first, first_at = self.pending.popleft()
+            second, second_at = self.pending.popleft()
+            if len(first) + len(second) <= MAX_MERGED_CHUNKS * self.chunk_bytes:
+                self.pending.appendleft((first + second, first_at))
+                self.merged_chunks += 1
+            else:
+                self.pending.appendleft((second, second_at))
+                self.dropped_chunks += 1
+
+    def stats(self) -> dict:
+
+        return {
+            "frames": self.frames,
+            "gaps": self.gaps,
+            "lostFrames": self.lost_frames,
+            "lateFrames": self.late_frames,
+            "bufferedMs": len(self.buffer) * 1000 // (SAMPLE_RATE * SAMPLE_WIDTH),
+            "pendingChunks": len(self.pending),
+            "mergedChunks": self.merged_chunks,
+            "droppedChunks": self.dropped_chunks,
+        }
@@ -0,0 +1,41 @@
+from collections import deque
+from typing import Deque, List, Optional
+
+
+class CaptionRingBuffer:
+    __slots__ = ("_items",)
+
+    def __init__(self, capacity: int):
+        self._items: Deque[dict] = deque(maxlen=capacity)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def append(self, payload: dict) -> None:
+
+        self._items.append(payload)
+        # Concurrent transcriptions can finish out of order; keep seq order
+        # so replay can stop scanning at the first already-seen caption.
+        if len(self._items) > 1 and self._items[-2]["seq"] > payload["seq"]:
+            ordered = sorted(self._items, key=lambda p: p["seq"])
+            self._items.clear()
+            self._items.extend(ordered)
+
+    def since(self, last_seq: int) -> Optional[List[dict]]:
+
+        if not self._items or self._items[0]["seq"] > last_seq + 1:
+            return None
+
+        missed = []
+        for payload in reversed(self._items):
+            if payload["seq"] <= last_seq:
+                break
+            missed.append(payload)
+        missed.reverse()
+        # Captions saved through the REST transcribe endpoints take a seq
+        # without passing through here; with a gap only the database has
+        # the full run.
+        for expected, payload in enumerate(missed, last_seq + 1):
+            if payload["seq"] != expected:
+                return None
+        return missed
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import Callable, Dict, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+BATCH_FIELDS = ("seq", "speakerId", "speakerName", "text", "start", "end")
+TRANSLATED_FIELDS = BATCH_FIELDS + ("originalText",)
+
+# (meeting_id, language, translated) -> (legacy rooms, legacy skip sids, batch sids)
+Audience = Tuple[List[str], List[str], List[str]]
+Key = Tuple[str, str, bool]
+
+
+class CaptionFanout:
+    def __init__(self, sio, audience: Callable[[str, str, bool], Audience], window_ms: int):
+        self.sio = sio
+        self.audience = audience
+        self.window = window_ms / 1000.0
+        self.counters: Counter = Counter()
+        self._pending: Dict[Key, List[dict]] = {}
+        self._timers: Dict[Key, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def publish(self, meeting_id: str, language: str, payload: dict, translated: bool = False) -> None:
+
+        key = (meeting_id, language, translated)
+        self._pending.setdefault(key, []).append(payload)
+        self.counters["segments"] += 1
+        # What the old emit-per-room, emit-per-segment path would have cost.
+        self.counters["baseline_emits"] += 1 if translated else 2
+
+        if key not in self._timers:
+            self._timers[key] = asyncio.get_running_loop().call_later(self.window, self._start_flush, key)
+
+    def _start_flush(self, key: Key) -> None:
+
+        # The loop only keeps a weak reference to tasks; hold on to the
+        # flush until it finishes.
+        task = asyncio.get_running_loop().create_task(self.flush(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self, key: Key) -> None:
+
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        payloads = self._pending.pop(key, [])
+        if not payloads:
+            return
+
+        meeting_id, language, translated = key
+        try:
+            rooms, skip, batch_sids = self.audience(meeting_id, language, translated)
+
+            for payload in payloads:
+                await self.sio.emit("caption-update", payload, room=rooms, skip_sid=skip or None)
+                self.counters["caption-update"] += 1
+
+            if batch_sids:
+                fields = TRANSLATED_FIELDS if translated else BATCH_FIELDS
+                batch = {
+                    "meetingId": meeting_id,
+                    "language": language,
+                    "fields": fields,
+                    "captions": [[p.get(f) for f in fields] for p in payloads],
+                }
+                await self.sio.emit("caption-batch", batch, room=batch_sids)
+                self.counters["caption-batch"] += 1
+        except Exception:
+            logger.exception("Failed to fan out %s captions for meeting %s", len(payloads), meeting_id)
+
+    async def drop_meeting(self, meeting_id: str) -> None:
+
+        for key in [k for k in self._pending if k[0] == meeting_id]:
+            await self.flush(key)
+
+    def structures(self) -> Dict[str, object]:
+
+        return {"captions.fanout-pending": self._pending}
+
+    def stats(self) -> dict:
+
+        emitted = self.counters["caption-update"] + self.counters["caption-batch"]
+        return {
+            "segments": self.counters["segments"],
+            "events": {
+                "caption-update": self.counters["caption-update"],
+                "caption-batch": self.counters["caption-batch"],
+            },
+            "emits": emitted,
+            "baselineEmits": self.counters["baseline_emits"],
+            "emitsSaved": max(0, self.counters["baseline_emits"] - emitted),
+        }
@@ -0,0 +1,23 @@
+from typing import Awaitable, Callable
+
+Handler = Callable[..., Awaitable]
+Layer = Callable[[str, Handler], Handler]
+
+
+def canonical_event(name: str) -> str:
+
+    # @sio.event handlers and their @sio.on aliases share one name,
+    # e.g. "webrtc_ice_candidate" and "ice-candidate".
+    name = name.replace("_", "-")
+    if name.startswith("webrtc-"):
+        name = name[len("webrtc-"):]
+    return name
+
+
+def install(sio, *layers: Layer, namespace: str = "/") -> None:
+
+    handlers = sio.handlers.get(namespace, {})
+    for event, handler in list(handlers.items()):
+        for layer in layers:
+            handler = layer(canonical_event(event), handler)
+        handlers[event] = handler
@@ -0,0 +1,26 @@
+import bisect
+import hashlib
+from typing import Iterable, List, Optional, Tuple
+
+
+def _hash(value: str) -> int:
+
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    def __init__(self, nodes: Iterable[str], replicas: int = 64):
+        self.nodes: List[str] = sorted(set(nodes))
+        points: List[Tuple[int, str]] = sorted(
+            (_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(replicas)
+        )
+        self._keys = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node_for(self, key: str) -> Optional[str]:
+
+        if not self._keys:
+            return None
+        # Adding or removing a node only moves the keys next to its points.
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._owners[index]
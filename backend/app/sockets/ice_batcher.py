@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import Dict, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+Pair = Tuple[str, str]
+
+
+def is_end_of_candidates(candidate) -> bool:
+
+    # Browsers signal the end of gathering with a null or empty candidate.
+    if candidate is None:
+        return True
+    if isinstance(candidate, dict):
+        return not candidate.get("candidate")
+    return candidate == ""
+
+
+class IceBatcher:
+    def __init__(self, sio, window_ms: int, max_batch: int):
+        self.sio = sio
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.counters: Counter = Counter()
+        self._pending: Dict[Pair, List] = {}
+        self._timers: Dict[Pair, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def forward(self, from_sid: str, to_sid: str, candidate, batched: bool) -> None:
+
+        self.counters["candidates"] += 1
+        if not batched:
+            await self.sio.emit("ice-candidate", {"candidate": candidate, "fromSocketId": from_sid}, to=to_sid)
+            self.counters["ice-candidate"] += 1
+            return
+
+        pair = (from_sid, to_sid)
+        batch = self._pending.setdefault(pair, [])
+        batch.append(candidate)
+        if is_end_of_candidates(candidate) or len(batch) >= self.max_batch:
+            await self.flush(pair)
+        elif pair not in self._timers:
+            self._timers[pair] = asyncio.get_running_loop().call_later(self.window, self._start_flush, pair)
+
+    def _start_flush(self, pair: Pair) -> None:
+
+        task = asyncio.get_running_loop().create_task(self.flush(pair))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self, pair: Pair) -> None:
+
+        timer = self._timers.pop(pair, None)
+        if timer:
+            timer.cancel()
+        candidates = self._pending.pop(pair, None)
+        if not candidates:
+            return
+
+        from_sid, to_sid = pair
+        try:
+            await self.sio.emit(
+                "ice-candidates",
+                {
+                    "fromSocketId": from_sid,
+                    "candidates": candidates,
+                    "complete": is_end_of_candidates(candidates[-1]),
+                },
+                to=to_sid
+            )
+            self.counters["ice-candidates"] += 1
+        except Exception:
+            logger.exception("Failed to forward %s ICE candidates %s -> %s", len(candidates), from_sid, to_sid)
+
+    def drop(self, sid: str) -> None:
+
+        for pair in [p for p in self._pending if sid in p]:
+            timer = self._timers.pop(pair, None)
+            if timer:
+                timer.cancel()
+            del self._pending[pair]
+
+    def structures(self) -> Dict[str, object]:
+
+        return {"ice.pending": self._pending}
+
+    def stats(self) -> dict:
+
+        emits = self.counters["ice-candidate"] + self.counters["ice-candidates"]
+        return {
+            "candidates": self.counters["candidates"],
+            "events": {
+                "ice-candidate": self.counters["ice-candidate"],
+                "ice-candidates": self.counters["ice-candidates"],
+            },
+            "emits": emits,
+            "emitsSaved": max(0, self.counters["candidates"] - emits),
+        }
@@ -0,0 +1,79 @@
+import logging
+import sys
+from collections import Counter, deque
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+Teardown = Callable[[str, bool], Awaitable[None]]
+
+MAX_DEPTH = 5
+
+
+def approximate_size(obj, max_depth: int = MAX_DEPTH) -> int:
+
+    # Follows containers and __slots__ objects only; anything else (tasks,
+    # locks, the event loop) is counted shallowly so the walk stays bounded.
+    seen = set()
+
+    def size(o, depth: int) -> int:
+        if id(o) in seen:
+            return 0
+        seen.add(id(o))
+        total = sys.getsizeof(o, 0)
+        if depth >= max_depth:
+            return total
+        if isinstance(o, dict):
+            total += sum(size(k, depth + 1) + size(v, depth + 1) for k, v in o.items())
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            total += sum(size(item, depth + 1) for item in o)
+        else:
+            for slot in getattr(type(o), "__slots__", ()):
+                if hasattr(o, slot):
+                    total += size(getattr(o, slot), depth + 1)
+        return total
+
+    return size(obj, 0)
+
+
+class MeetingLifecycle:
+    def __init__(self):
+        self._structures: Dict[str, Callable[[], object]] = {}
+        self._teardowns: List[Tuple[str, Teardown]] = []
+        self.counters: Counter = Counter()
+
+    def track(self, name: str, getter: Callable[[], object]) -> None:
+
+        self._structures[name] = getter
+
+    def track_structures(self, owner) -> None:
+
+        # owner.structures() maps report names to the containers it owns.
+        for name in owner.structures():
+            self.track(name, lambda name=name: owner.structures()[name])
+
+    def on_teardown(self, name: str, step: Teardown) -> None:
+
+        self._teardowns.append((name, step))
+
+    async def teardown(self, meeting_id: str, ended: bool) -> None:
+
+        self.counters["ended" if ended else "emptied"] += 1
+        # Every step runs even if an earlier one fails, so one bad structure
+        # cannot keep the rest of the meeting alive.
+        for name, step in self._teardowns:
+            try:
+                await step(meeting_id, ended)
+            except Exception:
+                logger.exception("Teardown step %s failed for meeting %s", name, meeting_id)
+
+    def report(self, memory: bool = True) -> dict:
+
+        structures = {}
+        for name, getter in self._structures.items():
+            obj = getter()
+            entry = {"count": len(obj)}
+            if memory:
+                entry["bytes"] = approximate_size(obj)
+            structures[name] = entry
+        return {"structures": structures, "teardowns": dict(self.counters)}
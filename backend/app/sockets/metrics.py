@@ -0,0 +1,243 @@
+import bisect
+import functools
+import time
+from typing import Callable, Dict, Optional
+
+# Upper bounds in milliseconds; the last bucket catches everything slower.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+
+def payload_size(obj, depth: int = 0) -> int:
+
+    # Rough wire size without serialising: exact for binary frames and
+    # strings, a fixed cost for scalars, recursive for containers.
+    if obj is None or isinstance(obj, bool):
+        return 4
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return len(obj)
+    if isinstance(obj, str):
+        return len(obj)
+    if isinstance(obj, (int, float)):
+        return 8
+    if depth > 8:
+        return 0
+    if isinstance(obj, dict):
+        return sum(len(str(k)) + payload_size(v, depth + 1) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sum(payload_size(item, depth + 1) for item in obj)
+    return 0
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "sum")
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS_MS)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value_ms: float) -> None:
+
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, value_ms)] += 1
+        self.total += 1
+        self.sum += value_ms
+
+    def quantile(self, q: float) -> Optional[float]:
+
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound if bound != float("inf") else None
+        return None
+
+    def snapshot(self) -> dict:
+
+        return {
+            "count": self.total,
+            "meanMs": round(self.sum / self.total, 3) if self.total else None,
+            "p50Ms": self.quantile(0.5),
+            "p95Ms": self.quantile(0.95),
+            "p99Ms": self.quantile(0.99),
+            "buckets": {
+                ("+Inf" if bound == float("inf") else str(bound)): count
+                for bound, count in zip(LATENCY_BUCKETS_MS, self.counts)
+            },
+        }
+
+
+class HandlerStats:
+    __slots__ = ("calls", "errors", "inbound_bytes", "latency")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.inbound_bytes = 0
+        self.latency = Histogram()
+
+    def snapshot(self) -> dict:
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "inboundBytes": self.inbound_bytes,
+            "latency": self.latency.snapshot(),
+        }
+
+
+class EmitStats:
+    __slots__ = ("emits", "recipients", "bytes")
+
+    def __init__(self):
+        self.emits = 0
+        self.recipients = 0
+        self.bytes = 0
+
+    def snapshot(self) -> dict:
+
+        return {"emits": self.emits, "recipients": self.recipients, "bytes": self.bytes}
+
+
+class SocketMetrics:
+    def __init__(
+        self,
+        sio,
+        meeting_of: Callable[[str], Optional[str]],
+        is_meeting: Callable[[str], bool],
+        namespace: str = "/"
+    ):
+        self.sio = sio
+        self.meeting_of = meeting_of
+        self.is_meeting = is_meeting
+        self.namespace = namespace
+        self.started = time.time()
+        self.handlers: Dict[str, HandlerStats] = {}
+        self.emitted: Dict[str, EmitStats] = {}
+        self.meetings: Dict[str, Dict[str, Dict[str, object]]] = {}
+
+    def _tables(self, meeting_id: Optional[str], kind: str) -> list:
+
+        tables = [self.handlers if kind == "handlers" else self.emitted]
+        if not meeting_id:
+            return tables
+        meeting = self.meetings.get(meeting_id)
+        # Only live meetings get a view, so a leave that tears the meeting
+        # down does not recreate it when its own call is recorded.
+        if meeting is None and self.is_meeting(meeting_id):
+            meeting = self.meetings[meeting_id] = {"handlers": {}, "emitted": {}}
+        if meeting is not None:
+            tables.append(meeting[kind])
+        return tables
+
+    def wrap(self, event: str, handler):
+
+        @functools.wraps(handler)
+        async def instrumented(sid, *args):
+            size = payload_size(args[0]) if args and event != "connect" else 0
+            # Resolved before the call: leave and disconnect forget the socket.
+            meeting_id = self.meeting_of(sid)
+            started = time.perf_counter()
+            failed = False
+            try:
+                return await handler(sid, *args)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                elapsed = (time.perf_counter() - started) * 1000
+                meeting_id = meeting_id or self.meeting_of(sid)
+                for table in self._tables(meeting_id, "handlers"):
+                    stats = table.get(event)
+                    if stats is None:
+                        stats = table[event] = HandlerStats()
+                    stats.calls += 1
+                    stats.errors += failed
+                    stats.inbound_bytes += size
+                    stats.latency.observe(elapsed)
+
+        return instrumented
+
+    def _recipients(self, to, skip_sid) -> int:
+
+        rooms = self.sio.manager.rooms.get(self.namespace, {})
+        skip = set(skip_sid if isinstance(skip_sid, list) else [skip_sid] if skip_sid else [])
+        # Counts sockets on this worker; other workers deliver their own share.
+        if to is None:
+            return max(0, len(rooms.get(None, {})) - len(skip))
+        if isinstance(to, (list, tuple)):
+            members = set()
+            for room in to:
+                members.update(rooms.get(room, {}))
+            return len(members - skip)
+        members = rooms.get(to, {})
+        return len(members) - sum(1 for s in skip if s in members)
+
+    def _room_meeting(self, to) -> Optional[str]:
+
+        # Targets are a meeting room, a "captions-<meeting>[-<language>]"
+        # room, or socket ids; room lists lead with the meeting's own room.
+        room = to[0] if isinstance(to, (list, tuple)) and to else to
+        if not isinstance(room, str):
+            return None
+        if self.is_meeting(room):
+            return room
+        if room.startswith("captions-"):
+            room = room[len("captions-"):]
+            if self.is_meeting(room):
+                return room
+            room = room.rsplit("-", 1)[0]
+            return room if self.is_meeting(room) else None
+        return self.meeting_of(room)
+
+    def instrument_emit(self, emit):
+
+        @functools.wraps(emit)
+        async def instrumented(event, data=None, to=None, room=None, skip_sid=None, **kwargs):
+            target = to if to is not None else room
+            try:
+                recipients = self._recipients(target, skip_sid)
+            except Exception:
+                recipients = 0
+            size = payload_size(data)
+            meeting_id = self._room_meeting(target) if target is not None else None
+            for table in self._tables(meeting_id, "emitted"):
+                stats = table.get(event)
+                if stats is None:
+                    stats = table[event] = EmitStats()
+                stats.emits += 1
+                stats.recipients += recipients
+                stats.bytes += size * max(recipients, 1)
+            return await emit(event, data, to=to, room=room, skip_sid=skip_sid, **kwargs)
+
+        return instrumented
+
+    def drop_meeting(self, meeting_id: str) -> Optional[dict]:
+
+        meeting = self.meetings.pop(meeting_id, None)
+        # Views whose runtime went away without a teardown go too.
+        for stale in [m for m in self.meetings if not self.is_meeting(m)]:
+            del self.meetings[stale]
+        return self._snapshot(meeting) if meeting else None
+
+    def _snapshot(self, tables: dict) -> dict:
+
+        return {
+            "handlers": {event: s.snapshot() for event, s in sorted(tables["handlers"].items())},
+            "emitted": {event: s.snapshot() for event, s in sorted(tables["emitted"].items())},
+        }
+
+    def snapshot(self) -> dict:
+
+        return dict(
+            self._snapshot({"handlers": self.handlers, "emitted": self.emitted}),
+            uptimeSeconds=round(time.time() - self.started),
+            meetings=len(self.meetings),
+        )
+
+    def meeting_snapshot(self, meeting_id: str) -> Optional[dict]:
+
+        meeting = self.meetings.get(meeting_id)
+        return self._snapshot(meeting) if meeting else None
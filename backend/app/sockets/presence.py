@@ -0,0 +1,87 @@
+from typing import Dict, Iterator, List, Optional
+
+
+class Session:
+    __slots__ = ("sid", "meeting_id", "user_id", "user_name")
+
+    def __init__(self, sid: str, meeting_id: str, user_id: Optional[str], user_name: str):
+        self.sid = sid
+        self.meeting_id = meeting_id
+        self.user_id = user_id
+        self.user_name = user_name
+
+    def as_user(self) -> dict:
+        return {"id": self.user_id, "name": self.user_name}
+
+
+class MeetingPresence:
+    __slots__ = ("by_sid", "by_user")
+
+    def __init__(self):
+        self.by_sid: Dict[str, Session] = {}
+        self.by_user: Dict[str, Session] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_sid)
+
+
+class PresenceIndex:
+    def __init__(self):
+        self.meetings: Dict[str, MeetingPresence] = {}
+        self.sessions: Dict[str, Session] = {}
+
+    def add(self, meeting_id: str, sid: str, user_id: Optional[str], user_name: str) -> Session:
+
+        self.remove(sid)
+        session = Session(sid, meeting_id, user_id, user_name)
+        meeting = self.meetings.get(meeting_id)
+        if meeting is None:
+            meeting = self.meetings[meeting_id] = MeetingPresence()
+        meeting.by_sid[sid] = session
+        if user_id:
+            meeting.by_user[user_id] = session
+        self.sessions[sid] = session
+        return session
+
+    def remove(self, sid: str) -> Optional[Session]:
+
+        session = self.sessions.pop(sid, None)
+        if session is None:
+            return None
+        meeting = self.meetings.get(session.meeting_id)
+        if meeting is not None:
+            meeting.by_sid.pop(sid, None)
+            # A newer socket for the same user may already own the user slot.
+            if session.user_id and meeting.by_user.get(session.user_id) is session:
+                del meeting.by_user[session.user_id]
+            if not meeting.by_sid:
+                del self.meetings[session.meeting_id]
+        return session
+
+    def get(self, sid: str) -> Optional[Session]:
+
+        return self.sessions.get(sid)
+
+    def find_user(self, meeting_id: str, user_id: str) -> Optional[Session]:
+
+        meeting = self.meetings.get(meeting_id)
+        return meeting.by_user.get(user_id) if meeting else None
+
+    def participants(self, meeting_id: str) -> Iterator[Session]:
+
+        meeting = self.meetings.get(meeting_id)
+        return iter(list(meeting.by_sid.values())) if meeting else iter(())
+
+    def count(self, meeting_id: str) -> int:
+
+        meeting = self.meetings.get(meeting_id)
+        return len(meeting) if meeting else 0
+
+    def remove_meeting(self, meeting_id: str) -> List[str]:
+
+        meeting = self.meetings.pop(meeting_id, None)
+        if meeting is None:
+            return []
+        for sid in meeting.by_sid:
+            self.sessions.pop(sid, None)
+        return list(meeting.by_sid)
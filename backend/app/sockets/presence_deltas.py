@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import Callable, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("socketId", "userId", "userName", "audio", "video", "screen")
+FLAGS = {"audio": 3, "video": 4, "screen": 5}
+
+
+class PresenceModel:
+    __slots__ = ("version", "sent_version", "host_id", "host_changed", "participants", "changed", "timer")
+
+    def __init__(self):
+        self.version = 0
+        self.sent_version = 0
+        self.host_id: Optional[str] = None
+        self.host_changed = False
+        # Socket id -> row in FIELDS order; flags stay None until first reported.
+        self.participants: Dict[str, list] = {}
+        self.changed: Set[str] = set()
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class PresenceBroadcaster:
+    def __init__(self, sio, audience: Callable[[str], Iterable[str]], tick_ms: int):
+        self.sio = sio
+        self.audience = audience
+        self.tick = tick_ms / 1000.0
+        self.counters: Counter = Counter()
+        self._meetings: Dict[str, PresenceModel] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _changed(self, meeting_id: str, presence: PresenceModel) -> None:
+
+        presence.version += 1
+        self.counters["changes"] += 1
+        # Meetings without delta sockets keep the model current but never tick.
+        if presence.timer is None and self.audience(meeting_id):
+            presence.timer = asyncio.get_running_loop().call_later(self.tick, self._start_flush, meeting_id)
+
+    def _start_flush(self, meeting_id: str) -> None:
+
+        task = asyncio.get_running_loop().create_task(self.flush(meeting_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def joined(self, meeting_id: str, sid: str, user_id: Optional[str], user_name: str) -> None:
+
+        presence = self._meetings.get(meeting_id)
+        if presence is None:
+            presence = self._meetings[meeting_id] = PresenceModel()
+        presence.participants[sid] = [sid, user_id, user_name, None, None, False]
+        presence.changed.add(sid)
+        self._changed(meeting_id, presence)
+
+    def left(self, meeting_id: str, sid: str) -> None:
+
+        presence = self._meetings.get(meeting_id)
+        if presence is None or presence.participants.pop(sid, None) is None:
+            return
+        presence.changed.add(sid)
+        self._changed(meeting_id, presence)
+
+    def update(self, meeting_id: str, sid: str, flag: str, value) -> None:
+
+        presence = self._meetings.get(meeting_id)
+        row = presence.participants.get(sid) if presence else None
+        if row is None or row[FLAGS[flag]] == value:
+            return
+        row[FLAGS[flag]] = value
+        presence.changed.add(sid)
+        self._changed(meeting_id, presence)
+
+    def set_host(self, meeting_id: str, host_id: str) -> bool:
+
+        presence = self._meetings.get(meeting_id)
+        if presence is None:
+            presence = self._meetings[meeting_id] = PresenceModel()
+        if presence.host_id == host_id:
+            self.counters["host-unchanged"] += 1
+            return False
+        presence.host_id = host_id
+        presence.host_changed = True
+        self._changed(meeting_id, presence)
+        return True
+
+    def snapshot(self, meeting_id: str, participants: Dict[str, dict]) -> dict:
+
+        # Membership comes from the shared state so sockets on other workers
+        # are listed too; flags are only known for local ones.
+        presence = self._meetings.get(meeting_id) or PresenceModel()
+        rows = []
+        for sid, user in participants.items():
+            row = presence.participants.get(sid)
+            rows.append(list(row) if row else [sid, user.get("id"), user.get("name"), None, None, False])
+        self.counters["snapshots"] += 1
+        return {
+            "meetingId": meeting_id,
+            "version": presence.version,
+            "hostId": presence.host_id,
+            "fields": FIELDS,
+            "participants": rows,
+        }
+
+    async def flush(self, meeting_id: str) -> None:
+
+        presence = self._meetings.get(meeting_id)
+        if presence is None:
+            return
+        if presence.timer:
+            presence.timer.cancel()
+            presence.timer = None
+        changed, presence.changed = presence.changed, set()
+        host_changed, presence.host_changed = presence.host_changed, False
+        base, presence.sent_version = presence.sent_version, presence.version
+        if not changed and not host_changed:
+            return
+
+        sids = list(self.audience(meeting_id))
+        if not sids:
+            return
+        # Upserts carry whole rows and removals are by socket id, so a delta
+        # that overlaps a snapshot can be applied again safely.
+        delta = {
+            "meetingId": meeting_id,
+            "baseVersion": base,
+            "version": presence.version,
+            "fields": FIELDS,
+            "upserts": [list(presence.participants[s]) for s in changed if s in presence.participants],
+            "left": [s for s in changed if s not in presence.participants],
+        }
+        if host_changed:
+            delta["hostId"] = presence.host_id
+        try:
+            await self.sio.emit("presence-delta", delta, room=sids)
+            self.counters["presence-delta"] += 1
+        except Exception:
+            logger.exception("Failed to send presence delta for meeting %s", meeting_id)
+
+    def drop_meeting(self, meeting_id: str) -> None:
+
+        presence = self._meetings.pop(meeting_id, None)
+        if presence is not None and presence.timer:
+            presence.timer.cancel()
+
+    def structures(self) -> Dict[str, object]:
+
+        return {"presence.meetings": self._meetings}
+
+    def stats(self) -> dict:
+
+        return {
+            "meetings": len(self._meetings),
+            "changes": self.counters["changes"],
+            "deltas": self.counters["presence-delta"],
+            "snapshots": self.counters["snapshots"],
+            "hostUpdatesSuppressed": self.counters["host-unchanged"],
+        }
@@ -0,0 +1,153 @@
+import asyncio
+import functools
+import logging
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("drop", "delay", "disconnect")
+MAX_ADDRESS_BUCKETS = 10000
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, reserve: bool = False) -> float:
+
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        wait = (1 - self.tokens) / self.rate
+        if reserve:
+            # Delayed calls queue behind each other instead of all waking at once.
+            self.tokens -= 1
+        return wait
+
+    def full(self) -> bool:
+
+        elapsed = time.monotonic() - self.updated
+        return self.tokens + elapsed * self.rate >= self.capacity
+
+
+class Rule:
+    __slots__ = ("rate", "burst", "policy")
+
+    def __init__(self, rate: float, burst: Optional[float] = None, policy: str = "drop"):
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self.policy = policy if policy in POLICIES else "drop"
+
+
+class RateLimiter:
+    def __init__(self, sio, rules: Dict[str, dict], max_delay_ms: int, trust_forwarded: bool = False):
+        self.sio = sio
+        self.trust_forwarded = trust_forwarded
+        self.rules = {event: Rule(**spec) for event, spec in rules.items()}
+        self.max_delay = max_delay_ms / 1000.0
+        self._buckets: Dict[str, Dict[str, TokenBucket]] = {}
+        self._addresses: Dict[str, TokenBucket] = {}
+        self.violations: Counter = Counter()
+
+    def _bucket(self, event: str, key: str, rule: Rule) -> TokenBucket:
+
+        if event == "connect":
+            bucket = self._addresses.get(key)
+            if bucket is None:
+                if len(self._addresses) >= MAX_ADDRESS_BUCKETS:
+                    self._prune_addresses()
+                bucket = self._addresses[key] = TokenBucket(rule.rate, rule.burst)
+            return bucket
+
+        buckets = self._buckets.setdefault(key, {})
+        bucket = buckets.get(event)
+        if bucket is None:
+            bucket = buckets[event] = TokenBucket(rule.rate, rule.burst)
+        return bucket
+
+    def _prune_addresses(self) -> None:
+
+        for address in [a for a, b in self._addresses.items() if b.full()]:
+            del self._addresses[address]
+
+    def forget(self, sid: str) -> None:
+
+        self._buckets.pop(sid, None)
+
+    def structures(self) -> Dict[str, object]:
+
+        return {"rate-limit.sockets": self._buckets, "rate-limit.addresses": self._addresses}
+
+    def stats(self) -> dict:
+
+        return {
+            "violations": {f"{event}:{policy}": n for (event, policy), n in self.violations.items()},
+            "trackedSockets": len(self._buckets),
+            "trackedAddresses": len(self._addresses),
+        }
+
+    def wrap(self, event: str, handler):
+
+        if event == "disconnect":
+            @functools.wraps(handler)
+            async def on_disconnect(sid, *args):
+                try:
+                    return await handler(sid, *args)
+                finally:
+                    self.forget(sid)
+            return on_disconnect
+
+        rule = self.rules.get(event)
+        if rule is None:
+            return handler
+
+        @functools.wraps(handler)
+        async def limited(sid, *args):
+            key = _client_address(args[0], self.trust_forwarded) if event == "connect" and args else sid
+            bucket = self._bucket(event, key, rule)
+            wait = bucket.take(reserve=rule.policy == "delay")
+            if wait and not await self._violate(event, sid, rule, bucket, wait):
+                # Returning False from connect refuses the connection.
+                return False if event == "connect" else None
+            return await handler(sid, *args)
+
+        return limited
+
+    async def _violate(self, event: str, sid: str, rule: Rule, bucket: TokenBucket, wait: float) -> bool:
+
+        if rule.policy == "delay":
+            if wait <= self.max_delay:
+                self.violations[(event, "delay")] += 1
+                await asyncio.sleep(wait)
+                return True
+            # Too far behind to wait for: give back the reserved token and drop.
+            bucket.tokens += 1
+
+        if rule.policy == "disconnect" and event != "connect":
+            self.violations[(event, "disconnect")] += 1
+            logger.warning("Disconnecting %s for flooding %s", sid, event)
+            await self.sio.disconnect(sid)
+            return False
+
+        self.violations[(event, "drop")] += 1
+        return False
+
+
+def _client_address(environ, trust_forwarded: bool) -> str:
+
+    if not isinstance(environ, dict):
+        return "unknown"
+    forwarded = environ.get("HTTP_X_FORWARDED_FOR") if trust_forwarded else None
+    if forwarded:
+        return forwarded.split(",")[0].strip()
+    return environ.get("REMOTE_ADDR") or "unknown"
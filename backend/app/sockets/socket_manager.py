@@ -1,32 +1,67 @@
 import socketio
-from typing import Dict, Set
+from typing import Dict, Optional, Set, Tuple
+import asyncio
 import logging
 import base64
 from typing import Any
 
 from app.core.config import settings
 from app.db.base import get_database
-from app.db.models import MEETINGS_COLLECTION
 from datetime import datetime
 from app.services.caption_service import CaptionService
-from app.services.captions_whisper_service import transcribe_audio
-from app.models.caption import CaptionEntryCreate
+from app.services.meeting_cache import meeting_headers
+from app.services.chat_service import chat_message
+from app.services.chat_writer import chat_writer
+from app.services.presence_writer import presence_writer
+from app.services import transcript_service
+from app.models.caption import CaptionEntryCreate, Translation
+from app.services.translation_service import get_translation_service
+from app.sockets.actors import ActorRegistry
+from app.sockets.caption_fanout import CaptionFanout
+from app.sockets.audio_stream import ENCODING, SAMPLE_RATE, AudioStream, parse_frame
+from app.sockets.dispatch import install
+from app.sockets.ice_batcher import IceBatcher
+from app.sockets.lifecycle import MeetingLifecycle
+from app.sockets.metrics import SocketMetrics
+from app.sockets.presence_deltas import PresenceBroadcaster
+from app.sockets.rate_limit import RateLimiter
+from app.sockets.state import create_client_manager, create_state
 
 
 sio = socketio.AsyncServer(
     async_mode='asgi',
+    client_manager=create_client_manager(),
+    serializer=settings.SOCKET_SERIALIZER,
     cors_allowed_origins=settings.ALLOWED_ORIGINS,
     logger=True,
     engineio_logger=True
 )
 
-active_meetings: Dict[str, Set[str]] = {}  
-socket_to_meeting: Dict[str, str] = {} 
-socket_to_user: Dict[str, dict] = {}  
+state = create_state()
 
-captions_enabled_meetings: Set[str] = set()
+meetings = ActorRegistry(
+    settings.CAPTION_REPLAY_BUFFER,
+    settings.MEETING_ACTOR_IDLE_SECONDS,
+    settings.MEETING_NODES,
+    settings.NODE_ID
+)
+
+lifecycle = MeetingLifecycle()
+
+socket_meetings: Dict[str, str] = {}
+socket_caption_language: Dict[str, Tuple[str, str]] = {}
+
+socket_features: Dict[str, Set[str]] = {}
 
-meeting_languages: Dict[str, str] = {}
+audio_streams: Dict[str, AudioStream] = {}
+
+_background_tasks: Set[asyncio.Task] = set()
+
+socket_metrics = SocketMetrics(sio, socket_meetings.get, lambda room: room in meetings.actors)
+if settings.SOCKET_METRICS_ENABLED:
+    # Every emit, including those from the caption and ICE batchers, goes
+    # through the instance attribute.
+    sio.emit = socket_metrics.instrument_emit(sio.emit)
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +77,287 @@ for _n in ('engineio', 'engineio.server', 'socketio', 'socketio.server'):
         lg.addHandler(logging.NullHandler())
 
 
+def _caption_payload(meeting_id: str, caption: dict) -> dict:
+
+    offset = float(caption.get("offset") or 0.0)
+    duration = float(caption.get("duration") or 0.0)
+    return {
+        "meetingId": meeting_id,
+        "speakerId": caption.get("speaker"),
+        "speakerName": caption.get("speaker_name"),
+        "text": caption.get("original_text"),
+        "start": offset,
+        "end": offset + duration,
+        "duration": duration,
+        "seq": caption.get("seq"),
+    }
+
+
+def _spawn(coro) -> asyncio.Task:
+
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+def _caption_room(meeting_id: str, language: str) -> str:
+
+    return f"captions-{meeting_id}-{language}"
+
+
+async def _subscribe_captions(sid: str, meeting_id: str, language: str) -> None:
+
+    await _unsubscribe_captions(sid)
+    meetings.runtime(meeting_id).subscribers.setdefault(language, set()).add(sid)
+    socket_caption_language[sid] = (meeting_id, language)
+    await sio.enter_room(sid, _caption_room(meeting_id, language))
+
+
+async def _unsubscribe_captions(sid: str) -> None:
+
+    current = socket_caption_language.pop(sid, None)
+    if not current:
+        return
+    meeting_id, language = current
+    runtime = meetings.peek(meeting_id)
+    sids = runtime.subscribers.get(language) if runtime else None
+    if sids is not None:
+        sids.discard(sid)
+        if not sids:
+            del runtime.subscribers[language]
+    try:
+        await sio.leave_room(sid, _caption_room(meeting_id, language))
+    except Exception:
+        pass
+
+
+def _subscribers(meeting_id: str) -> Dict[str, Set[str]]:
+
+    runtime = meetings.peek(meeting_id)
+    return runtime.subscribers if runtime else {}
+
+
+def _other_language_sids(meeting_id: str, language: str) -> list:
+
+    return [
+        sid
+        for lang, sids in _subscribers(meeting_id).items()
+        if lang != language
+        for sid in sids
+    ]
+
+
+def _set_features(sid: str, meeting_id: str, features) -> None:
+
+    features = {f for f in (features or []) if isinstance(f, str)}
+    socket_features[sid] = features
+    if "caption-batch" in features:
+        meetings.runtime(meeting_id).batch_sids.add(sid)
+    if "presence-delta" in features:
+        meetings.runtime(meeting_id).presence_sids.add(sid)
+
+
+def _clear_features(sid: str, meeting_id: str = None) -> None:
+
+    socket_features.pop(sid, None)
+    runtime = meetings.peek(meeting_id) if meeting_id else None
+    if runtime is not None:
+        runtime.batch_sids.discard(sid)
+        runtime.presence_sids.discard(sid)
+
+
+def _caption_audience(meeting_id: str, language: str, translated: bool):
+
+    runtime = meetings.peek(meeting_id)
+    batch = runtime.batch_sids if runtime else set()
+    if translated:
+        subscribers = _subscribers(meeting_id).get(language, set())
+        batch_sids = list(subscribers & batch)
+        return [_caption_room(meeting_id, language)], batch_sids, batch_sids
+
+    other = set(_other_language_sids(meeting_id, language))
+    return [meeting_id, f"captions-{meeting_id}"], list(other | batch), list(batch - other)
+
+
+caption_fanout = CaptionFanout(sio, _caption_audience, settings.CAPTION_BATCH_WINDOW_MS)
+
+ice_batcher = IceBatcher(sio, settings.ICE_BATCH_WINDOW_MS, settings.ICE_BATCH_MAX)
+
+
+def _presence_audience(meeting_id: str) -> Set[str]:
+
+    runtime = meetings.peek(meeting_id)
+    return runtime.presence_sids if runtime else set()
+
+
+def _legacy_skip(meeting_id: str, *sids: str) -> Optional[list]:
+
+    # Sockets on presence deltas hear about joins, leaves and toggles from
+    # presence-delta instead of the per-change events.
+    skip = set(sids) | _presence_audience(meeting_id)
+    return list(skip) or None
+
+
+presence = PresenceBroadcaster(sio, _presence_audience, settings.PRESENCE_TICK_MS)
+
+
+async def _translate_caption(meeting_id: str, payload: dict, source: str) -> None:
+
+    try:
+        targets = [
+            lang for lang, sids in _subscribers(meeting_id).items()
+            if sids and lang != source
+        ]
+        if not targets or not payload.get("text"):
+            return
+
+        service = get_translation_service()
+        results = await asyncio.gather(*(service.translate(payload["text"], source, t) for t in targets))
+        translations = [Translation(language=t, text=r) for t, r in zip(targets, results) if r]
+        if not translations:
+            return
+
+        for t in translations:
+            caption_fanout.publish(
+                meeting_id,
+                t.language,
+                dict(payload, text=t.text, language=t.language, originalText=payload["text"], originalLanguage=source),
+                translated=True
+            )
+
+        if payload.get("seq") is not None:
+            await CaptionService(get_database()).add_translations(meeting_id, payload["seq"], translations)
+    except Exception:
+        logger.exception("Failed to translate caption for meeting %s", meeting_id)
+
+
+def _chat_history(messages) -> list:
+
+    return [
+        {
+            "senderId": str(m.get("sender")) if m.get("sender") else None,
+            "senderName": m.get("sender_name") or m.get("senderName") or "User",
+            "text": m.get("text"),
+            "timestamp": int(m.get("timestamp").timestamp() * 1000) if m.get("timestamp") else None,
+        }
+        for m in messages
+    ]
+
+
+async def _replay_captions(sid: str, meeting_id: str, last_seq: int) -> None:
+
+    runtime = meetings.peek(meeting_id)
+    missed = runtime.captions.since(last_seq) if runtime else None
+    complete = True
+
+    if missed is None:
+        db = get_database()
+        page = await CaptionService(db).query_captions(
+            meeting_id,
+            after_cursor=last_seq,
+            limit=settings.CAPTION_REPLAY_LIMIT
+        )
+        missed = [_caption_payload(meeting_id, c) for c in page["captions"]]
+        complete = page["next_cursor"] is None
+
+    await sio.emit(
+        "caption-replay",
+        {"meetingId": meeting_id, "captions": missed, "complete": complete},
+        to=sid
+    )
+
+
+async def _release_socket(sid: str, meeting_id: Optional[str], flush_audio: bool) -> None:
+
+    socket_meetings.pop(sid, None)
+    _clear_features(sid, meeting_id)
+    if meeting_id:
+        presence.left(meeting_id, sid)
+    ice_batcher.drop(sid)
+    await _end_audio_stream(sid, flush=flush_audio)
+    await _unsubscribe_captions(sid)
+    runtime = meetings.peek(meeting_id) if meeting_id else None
+    if runtime is not None:
+        runtime.sids.discard(sid)
+
+
+async def _persist_departure(meeting_id: str, user: Optional[dict]) -> None:
+
+    user_id = user.get("id") if user else None
+    # A user with another socket still in the meeting stays active.
+    if user_id and not await state.find_user_socket(meeting_id, user_id):
+        presence_writer.left(meeting_id, user_id)
+
+
+async def _after_departure(meeting_id: str) -> None:
+
+    runtime = meetings.peek(meeting_id)
+    if runtime is None or not runtime.sids:
+        await lifecycle.teardown(meeting_id, ended=False)
+
+
+async def _teardown_sockets(meeting_id: str, ended: bool) -> None:
+
+    if not ended:
+        # Captions stay on while anyone, on any worker, is still in the meeting.
+        if not await state.count(meeting_id):
+            await state.disable_captions(meeting_id)
+        return
+
+    presence_writer.ended(meeting_id)
+    runtime = meetings.peek(meeting_id)
+    sids = set(await state.remove_meeting(meeting_id))
+    for sid in sids | (set(runtime.sids) if runtime else set()):
+        await _release_socket(sid, meeting_id, flush_audio=False)
+    await sio.close_room(meeting_id)
+    await sio.close_room(f"captions-{meeting_id}")
+
+
+async def _teardown_fanout(meeting_id: str, ended: bool) -> None:
+
+    await caption_fanout.drop_meeting(meeting_id)
+
+
+async def _teardown_presence(meeting_id: str, ended: bool) -> None:
+
+    presence.drop_meeting(meeting_id)
+
+
+async def _teardown_runtime(meeting_id: str, ended: bool) -> None:
+
+    runtime = meetings.drop(meeting_id, force=ended)
+    for subscribers in (runtime.subscribers.values() if runtime else ()):
+        for subscriber in subscribers:
+            socket_caption_language.pop(subscriber, None)
+
+
+async def _teardown_transcript(meeting_id: str, ended: bool) -> None:
+
+    transcript_service.release(meeting_id)
+
+
+async def _teardown_header(meeting_id: str, ended: bool) -> None:
+
+    meeting_headers.invalidate(meeting_id)
+
+
+async def _teardown_metrics(meeting_id: str, ended: bool) -> None:
+
+    view = socket_metrics.drop_meeting(meeting_id)
+    if view:
+        logger.info("Socket metrics for meeting %s: %s", meeting_id, view["handlers"])
+
+
+lifecycle.on_teardown("sockets", _teardown_sockets)
+lifecycle.on_teardown("caption-fanout", _teardown_fanout)
+lifecycle.on_teardown("presence", _teardown_presence)
+lifecycle.on_teardown("runtime", _teardown_runtime)
+lifecycle.on_teardown("transcript", _teardown_transcript)
+lifecycle.on_teardown("meeting-header", _teardown_header)
+lifecycle.on_teardown("metrics", _teardown_metrics)
+
+
 @sio.event
 async def connect(sid, environ):
    
@@ -49,23 +365,15 @@ async def connect(sid, environ):
 
 
 @sio.event
-async def disconnect(sid):
+async def disconnect(sid, reason=None):
    
     logger.info(f"Socket disconnected: {sid}")
  
-    if sid in socket_to_meeting:
-        meeting_id = socket_to_meeting[sid]
-        
-        if meeting_id in active_meetings:
-            active_meetings[meeting_id].discard(sid)
-            
-            if not active_meetings[meeting_id]:
-                del active_meetings[meeting_id]
-        
-        del socket_to_meeting[sid]
-    
-    if sid in socket_to_user:
-        del socket_to_user[sid]
+    meeting_id, user = await state.remove_socket(sid)
+    await _release_socket(sid, meeting_id, flush_audio=False)
+    if meeting_id:
+        await _persist_departure(meeting_id, user)
+        await _after_departure(meeting_id)
 
 
 @sio.event
@@ -75,31 +383,19 @@ async def join_meeting(sid, data):
     user_id = data.get("userId")
     user_name = data.get("userName", "User")
 
-    host_id = None
+    header = None
     try:
-        db = get_database()
-        doc = await db[MEETINGS_COLLECTION].find_one({"meeting_id": meeting_id}, {"status": 1, "host": 1})
-        if doc and doc.get("status") == "ended":
+        header = await meeting_headers.get(get_database(), meeting_id)
+        if header and header.get("status") == "ended":
             await sio.emit("join-error", {"message": "This meeting has ended."}, to=sid)
             return
-     
-        if doc and doc.get("host"):
-            host = doc.get("host")
-            if isinstance(host, dict):
-                host_id = str(host.get("_id") or host.get("id"))
-            else:
-                host_id = str(host)
     except Exception:
         logger.exception("Failed to check meeting status for %s", meeting_id)
+    host_id = header.get("host_id") if header else None
 
     await sio.enter_room(sid, meeting_id)
  
-    replaced_old_sid = None
-    if meeting_id in active_meetings and user_id:
-        for socket_id in list(active_meetings.get(meeting_id, set())):
-            if socket_id in socket_to_user and socket_to_user[socket_id].get("id") == user_id:
-                replaced_old_sid = socket_id
-                break
+    replaced_old_sid = await state.find_user_socket(meeting_id, user_id) if user_id else None
 
     if replaced_old_sid:
         logger.info(f"User {user_name} ({user_id}) reconnecting: replacing socket {replaced_old_sid} -> {sid}")
@@ -110,17 +406,10 @@ async def join_meeting(sid, data):
  
             pass
 
-        active_meetings[meeting_id].discard(replaced_old_sid)
-        if replaced_old_sid in socket_to_meeting:
-            del socket_to_meeting[replaced_old_sid]
-        if replaced_old_sid in socket_to_user:
-            del socket_to_user[replaced_old_sid]
+        await state.remove_socket(replaced_old_sid)
+        await _release_socket(replaced_old_sid, meeting_id, flush_audio=True)
 
-        socket_to_meeting[sid] = meeting_id
-        socket_to_user[sid] = {"id": user_id, "name": user_name}
-        if meeting_id not in active_meetings:
-            active_meetings[meeting_id] = set()
-        active_meetings[meeting_id].add(sid)
+        await state.add_socket(meeting_id, sid, {"id": user_id, "name": user_name})
 
         await sio.emit(
             "user-reconnected",
@@ -131,16 +420,11 @@ async def join_meeting(sid, data):
                 "newSocketId": sid,
             },
             room=meeting_id,
-            skip_sid=sid,
+            skip_sid=_legacy_skip(meeting_id, sid),
         )
     else:
 
-        socket_to_meeting[sid] = meeting_id
-        socket_to_user[sid] = {"id": user_id, "name": user_name}
-        
-        if meeting_id not in active_meetings:
-            active_meetings[meeting_id] = set()
-        active_meetings[meeting_id].add(sid)
+        await state.add_socket(meeting_id, sid, {"id": user_id, "name": user_name})
 
         await sio.emit(
             "user-joined",
@@ -150,10 +434,17 @@ async def join_meeting(sid, data):
                 "socketId": sid
             },
             room=meeting_id,
-            skip_sid=sid
+            skip_sid=_legacy_skip(meeting_id, sid)
         )
     
  
+    presence.joined(meeting_id, sid, user_id, user_name)
+    if user_id:
+        presence_writer.joined(meeting_id, user_id)
+    meetings.runtime(meeting_id).sids.add(sid)
+    socket_meetings[sid] = meeting_id
+    _set_features(sid, meeting_id, data.get("features"))
+
     await sio.emit(
         "ice-servers",
         {
@@ -165,46 +456,54 @@ async def join_meeting(sid, data):
         to=sid
     )
 
-    existing_participants = []
-    for socket_id in active_meetings.get(meeting_id, set()):
-        if socket_id != sid and socket_id in socket_to_user:
-            user = socket_to_user[socket_id]
-            existing_participants.append({
-                "socketId": socket_id,
-                "userId": user["id"],
-                "userName": user["name"]
-            })
-    
-    await sio.emit("existing-participants", existing_participants, to=sid)
+    participants = await state.participants(meeting_id)
+    delta_socket = "presence-delta" in socket_features.get(sid, ())
+    # Presence-delta sockets get the host and participants in one versioned
+    # snapshot, so it is taken after the host is recorded.
+    host_changed = presence.set_host(meeting_id, host_id) if host_id else False
+
+    if delta_socket:
+        await sio.emit("presence-snapshot", presence.snapshot(meeting_id, participants), to=sid)
+    else:
+        existing_participants = []
+        for socket_id, user in participants.items():
+            if socket_id != sid:
+                existing_participants.append({
+                    "socketId": socket_id,
+                    "userId": user["id"],
+                    "userName": user["name"]
+                })
 
-    if host_id:
-        await sio.emit("host-updated", {"hostId": host_id}, room=meeting_id)
+        await sio.emit("existing-participants", existing_participants, to=sid)
+
+    # The host rarely changes, so the room only hears about it when it does;
+    # a joiner on the legacy events still gets it once.
+    if host_changed:
+        await sio.emit("host-updated", {"hostId": host_id}, room=meeting_id, skip_sid=_legacy_skip(meeting_id))
+    elif host_id and not delta_socket:
+        await sio.emit("host-updated", {"hostId": host_id}, to=sid)
 
     try:
-        db = get_database()
-        doc = await db[MEETINGS_COLLECTION].find_one({"meeting_id": meeting_id}, {"messages": {"$slice": -100}})
-        history = []
-        if doc and doc.get("messages"):
-            for m in doc.get("messages", []):
-                history.append({
-                    "senderId": str(m.get("sender")) if m.get("sender") else None,
-                    "senderName": m.get("senderName") or "User",
-                    "text": m.get("text"),
-                    "timestamp": int(m.get("timestamp").timestamp() * 1000) if m.get("timestamp") else None,
-                })
+        history = _chat_history(header["messages"]) if header else []
         await sio.emit("chat-history", history, to=sid)
     except Exception:
         logger.exception("Failed to load chat history for meeting %s", meeting_id)
 
+    last_caption_seq = data.get("lastCaptionSeq")
+    if last_caption_seq is not None:
+        try:
+            await _replay_captions(sid, meeting_id, int(last_caption_seq))
+        except Exception:
+            logger.exception("Failed to replay captions for meeting %s", meeting_id)
+
 
 @sio.event
 async def leave_meeting(sid, data):
   
-    meeting_id = socket_to_meeting.get(sid)
+    meeting_id, user = await state.remove_socket(sid)
+    await _release_socket(sid, meeting_id, flush_audio=True)
     
     if meeting_id:
-        user = socket_to_user.get(sid)
-
         await sio.leave_room(sid, meeting_id)
 
         await sio.emit(
@@ -213,31 +512,24 @@ async def leave_meeting(sid, data):
                 "userId": user["id"] if user else None,
                 "socketId": sid
             },
-            room=meeting_id
+            room=meeting_id,
+            skip_sid=_legacy_skip(meeting_id)
         )
-        
-
-        if meeting_id in active_meetings:
-            active_meetings[meeting_id].discard(sid)
-            if not active_meetings[meeting_id]:
-                del active_meetings[meeting_id]
-        
-        del socket_to_meeting[sid]
-        if sid in socket_to_user:
-            del socket_to_user[sid]
+        await _persist_departure(meeting_id, user)
+        await _after_departure(meeting_id)
 
 
 @sio.on('camera-state-changed')
 async def handle_camera_state_changed(sid, data):
 
-    meeting_id = socket_to_meeting.get(sid)
+    meeting_id = await state.meeting_of(sid)
     if not meeting_id:
         return
     
     user_id = data.get("userId")
     is_video_on = data.get("isVideoOn")
     
-
+    presence.update(meeting_id, sid, "video", is_video_on)
 
     await sio.emit(
         "camera-state-changed",
@@ -245,7 +537,8 @@ async def handle_camera_state_changed(sid, data):
             "userId": user_id,
             "isVideoOn": is_video_on
         },
-        room=meeting_id
+        room=meeting_id,
+        skip_sid=_legacy_skip(meeting_id)
     )
 
 
@@ -290,21 +583,26 @@ async def webrtc_ice_candidate(sid, data):
     candidate = data.get("candidate")
     
     if target_sid:
-        await sio.emit(
-            "ice-candidate",
-            {
-                "candidate": candidate,
-                "fromSocketId": sid
-            },
-            to=target_sid
-        )
+        await ice_batcher.forward(sid, target_sid, candidate, "ice-batch" in socket_features.get(target_sid, ()))
+
+
+@sio.on("ice-candidates")
+async def on_ice_candidates(sid, data):
+
+    target_sid = data.get("targetSocketId")
+    candidates = data.get("candidates") or []
+
+    if target_sid and isinstance(candidates, list):
+        batched = "ice-batch" in socket_features.get(target_sid, ())
+        for candidate in candidates:
+            await ice_batcher.forward(sid, target_sid, candidate, batched)
 
 
 @sio.event
 async def send_chat_message(sid, data):
     
-    meeting_id = socket_to_meeting.get(sid)
-    user = socket_to_user.get(sid)
+    meeting_id = await state.meeting_of(sid)
+    user = await state.user_of(sid)
     text = data.get("text", "").strip()
     
     if meeting_id and text:
@@ -315,25 +613,20 @@ async def send_chat_message(sid, data):
             "timestamp": data.get("timestamp") or int(datetime.utcnow().timestamp() * 1000)
         }
 
+        await sio.emit("chat-message", payload, room=meeting_id)
+
         try:
-            db = get_database()
-            await db[MEETINGS_COLLECTION].update_one(
-                {"meeting_id": meeting_id},
-                {
-                    "$push": {
-                        "messages": {
-                            "sender": user["id"] if user else None,
-                            "senderName": payload["senderName"],
-                            "text": payload["text"],
-                            "timestamp": datetime.utcfromtimestamp(payload["timestamp"] / 1000.0),
-                        }
-                    }
-                }
+            message = chat_message(
+                meeting_id,
+                user["id"] if user else None,
+                payload["senderName"],
+                payload["text"],
+                datetime.utcfromtimestamp(payload["timestamp"] / 1000.0)
             )
+            meeting_headers.append_message(meeting_id, message)
+            chat_writer.enqueue(meeting_id, message)
         except Exception:
-            logger.exception("Failed to persist chat message for meeting %s", meeting_id)
-
-        await sio.emit("chat-message", payload, room=meeting_id)
+            logger.exception("Failed to queue chat message for meeting %s", meeting_id)
 
 
 @sio.event
@@ -347,8 +640,7 @@ async def start_captions(sid, data):
     await sio.enter_room(sid, f"captions-{meeting_id}")
 
     try:
-        captions_enabled_meetings.add(meeting_id)
-        meeting_languages[meeting_id] = language
+        await state.enable_captions(meeting_id, language)
     except Exception:
         logger.exception("Failed to mark captions enabled for %s", meeting_id)
 
@@ -368,10 +660,7 @@ async def stop_captions(sid, data):
     meeting_id = data.get("meetingId")
     logger.info(f"Stopping captions for meeting {meeting_id} requested by {sid}")
     try:
-        if meeting_id in captions_enabled_meetings:
-            captions_enabled_meetings.discard(meeting_id)
-        if meeting_id in meeting_languages:
-            del meeting_languages[meeting_id]
+        await state.disable_captions(meeting_id)
     except Exception:
         logger.exception("Failed to stop captions for %s", meeting_id)
 
@@ -390,32 +679,86 @@ async def stop_captions(sid, data):
     )
 
 
+@sio.on("subscribe-captions")
+async def subscribe_captions(sid, data):
+
+    joined = await state.meeting_of(sid)
+    meeting_id = data.get("meetingId") or joined
+    language = data.get("language")
+    if not meeting_id or not language:
+        return
+    if meeting_id != joined:
+        logger.warning("Rejected caption subscription of %s to meeting %s it has not joined", sid, meeting_id)
+        return
+
+    await _subscribe_captions(sid, meeting_id, language)
+    await sio.emit("captions-subscribed", {"meetingId": meeting_id, "language": language}, to=sid)
+
+
+@sio.on("unsubscribe-captions")
+async def unsubscribe_captions(sid, data=None):
+
+    await _unsubscribe_captions(sid)
+
+
 @sio.event
 async def toggle_audio(sid, data):
-    meeting_id = socket_to_meeting.get(sid)
+    meeting_id = await state.meeting_of(sid)
     is_enabled = data.get("isEnabled") if isinstance(data, dict) else None
     if meeting_id:
+        presence.update(meeting_id, sid, "audio", is_enabled)
         await sio.emit(
             "user-audio-toggle",
             {"socketId": sid, "isEnabled": is_enabled},
             room=meeting_id,
-            skip_sid=sid,
+            skip_sid=_legacy_skip(meeting_id, sid),
         )
 
 
 @sio.event
 async def toggle_video(sid, data):
-    meeting_id = socket_to_meeting.get(sid)
+    meeting_id = await state.meeting_of(sid)
     is_enabled = data.get("isEnabled") if isinstance(data, dict) else None
     if meeting_id:
+        presence.update(meeting_id, sid, "video", is_enabled)
         await sio.emit(
             "user-video-toggle",
             {"socketId": sid, "isEnabled": is_enabled},
             room=meeting_id,
-            skip_sid=sid,
+            skip_sid=_legacy_skip(meeting_id, sid),
         )
 
 
+def _binary_audio(sid: str) -> bool:
+
+    return (
+        settings.AUDIO_BINARY_ONLY
+        or settings.SOCKET_SERIALIZER == "msgpack"
+        or "binary-audio" in socket_features.get(sid, ())
+    )
+
+
+def _decode_audio(audio_data, binary_only: bool):
+
+    if isinstance(audio_data, bytes):
+        return audio_data
+    if isinstance(audio_data, (bytearray, memoryview)):
+        return bytes(audio_data)
+    if binary_only:
+        logger.warning("Rejected non-binary audio data: %s", type(audio_data))
+        return None
+
+    # Legacy text clients: data URLs, bare base64 or JSON number arrays.
+    if isinstance(audio_data, str):
+        if audio_data.startswith("data:") and "," in audio_data:
+            _, audio_data = audio_data.split(",", 1)
+        return base64.b64decode(audio_data)
+    if isinstance(audio_data, list):
+        return bytes(bytearray(audio_data))
+    logger.warning("Unsupported audio data type: %s", type(audio_data))
+    return None
+
+
 @sio.event
 async def audio_data(sid, data):
 
@@ -428,41 +771,31 @@ async def audio_data(sid, data):
     if not meeting_id or not audio_data:
         return
 
-    audio_bytes = None
     try:
-        if isinstance(audio_data, str):
-            
-            if audio_data.startswith("data:") and "," in audio_data:
-                _, b64 = audio_data.split(",", 1)
-            else:
-                b64 = audio_data
-            audio_bytes = base64.b64decode(b64)
-        elif isinstance(audio_data, (bytes, bytearray)):
-            audio_bytes = bytes(audio_data)
-        elif isinstance(audio_data, list):
-            audio_bytes = bytes(bytearray(audio_data))
-        else:
-            logger.warning("Unsupported audio data type: %s", type(audio_data))
-            return
+        audio_bytes = _decode_audio(audio_data, _binary_audio(sid))
     except Exception as e:
         logger.exception("Failed to decode audio data: %s", e)
         return
+    if not audio_bytes:
+        return
 
-    user = socket_to_user.get(sid)
+    user = await state.user_of(sid)
     speaker_name = user["name"] if user else "Unknown"
     speaker_id = user["id"] if user else None
 
     logger.info(f"Received audio data from {speaker_name} in meeting {meeting_id}")
 
-    if meeting_id not in captions_enabled_meetings:
+    captions_language = await state.captions_language(meeting_id)
+    if captions_language is None:
         logger.info("Ignoring audio for meeting %s because captions are not enabled", meeting_id)
         return
 
+    received_at = datetime.utcnow()
     try:
         db = get_database()
         caption_service = CaptionService(db)
   
-        preferred_lang = meeting_languages.get(meeting_id) or language
+        preferred_lang = captions_language or language
         result = await caption_service.transcribe_audio(audio_bytes, language=preferred_lang, translate=translate, mime_type=mime_type)
     except Exception as e:
         logger.exception("Transcription failed: %s", e)
@@ -473,6 +806,11 @@ async def audio_data(sid, data):
             logger.exception('Failed to emit caption-error')
         return
 
+    await meetings.call(meeting_id, _publish_captions, meeting_id, speaker_id, speaker_name, result, language, received_at)
+
+
+async def _publish_captions(meeting_id: str, speaker_id, speaker_name: str, result: dict, language: str, received_at: datetime) -> None:
+
     captions = result.get("captions") or []
     resp_lang = result.get("language") or language
 
@@ -496,10 +834,13 @@ async def audio_data(sid, data):
                 original_language=resp_lang,
                 translations=[],
                 confidence=0.8,
+                timestamp=received_at,
                 duration=duration,
+                offset=float(start),
                 is_final=True,
             )
 
+            saved = None
             try:
                 saved = await caption_service.add_caption(meeting_id, caption_entry)
 
@@ -515,18 +856,129 @@ async def audio_data(sid, data):
                 "start": start,
                 "end": end,
                 "duration": duration,
+                "seq": saved,
             }
 
-            try:
-                await sio.emit("caption-update", payload, room=meeting_id)
-                await sio.emit("caption-update", payload, room=f"captions-{meeting_id}")
-                logger.info(f"EmittedCaption meeting={meeting_id} speaker={speaker_name} text={text[:200]}")
-            except Exception:
-                logger.exception("Failed to emit caption-update for meeting %s", meeting_id)
+            if saved is not None:
+                meetings.runtime(meeting_id).captions.append(payload)
+
+            caption_fanout.publish(meeting_id, resp_lang, payload)
+            logger.info(f"EmittedCaption meeting={meeting_id} speaker={speaker_name} text={text[:200]}")
+
+            if _subscribers(meeting_id):
+                _spawn(_translate_caption(meeting_id, payload, resp_lang))
     except Exception:
         logger.exception("Error processing captions for meeting %s", meeting_id)
 
 
+async def _end_audio_stream(sid: str, flush: bool) -> None:
+
+    stream = audio_streams.pop(sid, None)
+    if stream is None or not flush:
+        return
+    chunk = stream.take_chunk(final=True)
+    if chunk:
+        _queue_stream_chunk(stream, *chunk)
+
+
+def _queue_stream_chunk(stream: AudioStream, pcm: bytes, started_at: datetime) -> None:
+
+    stream.enqueue(pcm, started_at)
+    if stream.consumer is None or stream.consumer.done():
+        stream.consumer = _spawn(_drain_stream(stream))
+
+
+async def _drain_stream(stream: AudioStream) -> None:
+
+    # One consumer per stream keeps chunks in order and bounds the work in
+    # flight; enqueue() merges or drops what piles up behind it.
+    while stream.pending:
+        pcm, started_at = stream.pending.popleft()
+        try:
+            await _transcribe_stream_chunk(stream, pcm, started_at)
+        except Exception:
+            logger.exception("Failed to caption streamed audio for meeting %s", stream.meeting_id)
+
+
+async def _transcribe_stream_chunk(stream: AudioStream, pcm: bytes, started_at: datetime) -> None:
+
+    captions_language = await state.captions_language(stream.meeting_id)
+    if captions_language is None:
+        return
+    language = captions_language or stream.language
+    try:
+        result = await CaptionService(get_database()).transcribe_pcm(pcm, language=language, translate=stream.translate)
+    except Exception as e:
+        logger.exception("Stream transcription failed for meeting %s", stream.meeting_id)
+        try:
+            await sio.emit('caption-error', {"meetingId": stream.meeting_id, "message": str(e)}, room=stream.meeting_id)
+        except Exception:
+            logger.exception('Failed to emit caption-error')
+        return
+    await meetings.call(
+        stream.meeting_id,
+        _publish_captions,
+        stream.meeting_id, stream.speaker_id, stream.speaker_name, result, language, started_at
+    )
+
+
+@sio.on("audio-stream-start")
+async def on_audio_stream_start(sid, data=None):
+
+    data = data or {}
+    if (
+        data.get("encoding", ENCODING) != ENCODING
+        or int(data.get("sampleRate") or SAMPLE_RATE) != SAMPLE_RATE
+        or int(data.get("channels") or 1) != 1
+    ):
+        return {"ok": False, "error": f"expected {ENCODING} mono at {SAMPLE_RATE} Hz"}
+
+    meeting_id = await state.meeting_of(sid)
+    if not meeting_id:
+        return {"ok": False, "error": "join a meeting first"}
+
+    await _end_audio_stream(sid, flush=True)
+    user = await state.user_of(sid)
+    audio_streams[sid] = AudioStream(
+        meeting_id,
+        user["id"] if user else None,
+        user["name"] if user else "Unknown",
+        data.get("language"),
+        bool(data.get("translate", False)),
+        settings.AUDIO_STREAM_CHUNK_MS,
+        settings.AUDIO_STREAM_MAX_GAP_MS,
+        settings.AUDIO_STREAM_MAX_PENDING_CHUNKS,
+    )
+    return {"ok": True, "sampleRate": SAMPLE_RATE, "chunkMs": settings.AUDIO_STREAM_CHUNK_MS, "nextSeq": 0}
+
+
+@sio.on("audio-frame")
+async def on_audio_frame(sid, data):
+
+    stream = audio_streams.get(sid)
+    frame = parse_frame(data)
+    if stream is None or frame is None:
+        return
+
+    seq, pcm = frame
+    expected = stream.next_seq
+    if stream.push(seq, pcm) > 0:
+        await sio.emit("audio-stream-gap", {"expectedSeq": expected, "receivedSeq": seq}, to=sid)
+
+    chunk = stream.take_chunk()
+    if chunk:
+        _queue_stream_chunk(stream, *chunk)
+
+
+@sio.on("audio-stream-stop")
+async def on_audio_stream_stop(sid, data=None):
+
+    stream = audio_streams.get(sid)
+    stats = stream.stats() if stream else None
+    await _end_audio_stream(sid, flush=True)
+    return {"ok": stats is not None, "stats": stats}
+
+
 @sio.event
 async def new_caption(sid, data):
  
@@ -548,23 +1000,24 @@ async def on_leave_meeting(sid, data=None):
     return await leave_meeting(sid, data or {})
 
 
+@sio.on("presence-sync")
+async def on_presence_sync(sid, data=None):
+
+    # Clients that see a delta whose baseVersion is ahead of them re-sync here.
+    meeting_id = await state.meeting_of(sid)
+    if not meeting_id:
+        return None
+    return presence.snapshot(meeting_id, await state.participants(meeting_id))
+
+
 @sio.on("get-chat-history")
 async def on_get_chat_history(sid):
-    meeting_id = socket_to_meeting.get(sid)
+    meeting_id = await state.meeting_of(sid)
     if not meeting_id:
         return
     try:
-        db = get_database()
-        doc = await db[MEETINGS_COLLECTION].find_one({"meeting_id": meeting_id}, {"messages": {"$slice": -100}})
-        history = []
-        if doc and doc.get("messages"):
-            for m in doc.get("messages", []):
-                history.append({
-                    "senderId": str(m.get("sender")) if m.get("sender") else None,
-                    "senderName": m.get("senderName") or "User",
-                    "text": m.get("text"),
-                    "timestamp": int(m.get("timestamp").timestamp() * 1000) if m.get("timestamp") else None,
-                })
+        header = await meeting_headers.get(get_database(), meeting_id)
+        history = _chat_history(header["messages"]) if header else []
         await sio.emit("chat-history", history, to=sid)
     except Exception:
         logger.exception("Failed to load chat history (on-demand) for %s", meeting_id)
@@ -618,32 +1071,34 @@ async def on_stop_screen_share(sid, data=None):
 @sio.event
 async def start_screen_share(sid):
     
-    meeting_id = socket_to_meeting.get(sid)
+    meeting_id = await state.meeting_of(sid)
     
     if meeting_id:
         logger.info(f"User {sid} started screen sharing in meeting {meeting_id}")
 
+        presence.update(meeting_id, sid, "screen", True)
         await sio.emit(
             "user-started-screen-share",
             {"socketId": sid},
             room=meeting_id,
-            skip_sid=sid
+            skip_sid=_legacy_skip(meeting_id, sid)
         )
 
 
 @sio.event
 async def stop_screen_share(sid):
    
-    meeting_id = socket_to_meeting.get(sid)
+    meeting_id = await state.meeting_of(sid)
     
     if meeting_id:
         logger.info(f"User {sid} stopped screen sharing in meeting {meeting_id}")
 
+        presence.update(meeting_id, sid, "screen", False)
         await sio.emit(
             "user-stopped-screen-share",
             {"socketId": sid},
             room=meeting_id,
-            skip_sid=sid
+            skip_sid=_legacy_skip(meeting_id, sid)
         )
 
 
@@ -653,7 +1108,7 @@ async def end_meeting(sid, data):
     meeting_id = data.get("meetingId")
     
     if not meeting_id:
-        meeting_id = socket_to_meeting.get(sid)
+        meeting_id = await state.meeting_of(sid)
     
     if meeting_id:
         logger.info(f"Meeting {meeting_id} ended by {sid}")
@@ -672,27 +1127,78 @@ async def end_meeting(sid, data):
             from app.services.meeting_service import MeetingService
             meeting_service = MeetingService(db)
 
-          
-            updated_meeting = await meeting_service.end_meeting(meeting_id)
-
-            try:
-                if updated_meeting:
-                    caps_url = updated_meeting.get("captionsFilePath") or updated_meeting.get("captions_file_path")
-                    caps_text = updated_meeting.get("captionsText") or updated_meeting.get("captions_text")
-                    if caps_url or caps_text:
-                        await sio.emit(
-                            "captions-ready",
-                            {
-                                "meetingId": meeting_id,
-                                "captionsFilePath": caps_url,
-                                "captionsText": caps_text,
-                            },
-                            room=meeting_id,
-                        )
-            except Exception:
-                logger.exception("Failed to emit captions-ready for %s", meeting_id)
+            # Teardown closes the meeting room before the transcript is
+            # published, so captions-ready goes to the sockets present now.
+            recipients = list(await state.participants(meeting_id))
+            await meeting_service.end_meeting(meeting_id, recipients=recipients)
         except Exception:
             logger.exception("Failed to update meeting end state for %s", meeting_id)
 
-        if meeting_id in active_meetings:
-            del active_meetings[meeting_id]
+        await lifecycle.teardown(meeting_id, ended=True)
+        logger.info("Caption fan-out totals: %s", caption_fanout.stats())
+
+
+rate_limiter = RateLimiter(
+    sio,
+    settings.RATE_LIMITS,
+    settings.RATE_LIMIT_MAX_DELAY_MS,
+    settings.RATE_LIMIT_TRUST_FORWARDED
+)
+
+# Events that change who is in a meeting or what it is doing run one at a
+# time on that meeting's actor; rate limiting sits in front of the queue.
+SERIALIZED_EVENTS = (
+    "join-meeting",
+    "leave-meeting",
+    "disconnect",
+    "start-captions",
+    "stop-captions",
+    "subscribe-captions",
+    "unsubscribe-captions",
+    "end-meeting",
+)
+
+
+async def _event_meeting(event: str, sid: str, data) -> Optional[str]:
+
+    if isinstance(data, dict) and data.get("meetingId"):
+        return data["meetingId"]
+    return await state.meeting_of(sid)
+
+
+async def _foreign_meeting(event: str, sid: str, meeting_id: str) -> bool:
+
+    if event != "join-meeting":
+        return False
+    owner = meetings.owner(meeting_id)
+    logger.warning("Rejected join for meeting %s owned by %s on %s", meeting_id, owner, settings.NODE_ID)
+    await sio.emit(
+        "join-error",
+        {
+            "message": "This meeting is served by another worker; reconnect with meetingId in the connection query.",
+            "reason": "wrong-node",
+            "owner": owner,
+        },
+        to=sid
+    )
+    return True
+
+
+for _owner in (state, ice_batcher, presence, caption_fanout, chat_writer, presence_writer, meeting_headers, rate_limiter, transcript_service):
+    lifecycle.track_structures(_owner)
+lifecycle.track("meetings.runtime", lambda: [a.runtime for a in meetings.actors.values()])
+lifecycle.track("sockets.meetings", lambda: socket_meetings)
+lifecycle.track("sockets.features", lambda: socket_features)
+lifecycle.track("sockets.caption-language", lambda: socket_caption_language)
+lifecycle.track("sockets.audio-streams", lambda: audio_streams)
+lifecycle.track("tasks.background", lambda: _background_tasks)
+lifecycle.track("metrics.meetings", lambda: socket_metrics.meetings)
+
+# Innermost first: metrics time the handler itself, the actor queue and rate
+# limits wrap around it.
+layers = [meetings.serialize(SERIALIZED_EVENTS, _event_meeting, _foreign_meeting)]
+if settings.SOCKET_METRICS_ENABLED:
+    layers.insert(0, socket_metrics.wrap)
+if settings.RATE_LIMIT_ENABLED:
+    layers.append(rate_limiter.wrap)
+install(sio, *layers)
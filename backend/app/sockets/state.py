@@ -0,0 +1,249 @@
+import json
+import logging
+import socket
+from typing import Dict, List, Optional, Tuple
+
+import socketio
+
+from app.core.config import settings
+from app.sockets.presence import PresenceIndex
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryState:
+    def __init__(self):
+        self.presence = PresenceIndex()
+        self.meeting_languages: Dict[str, str] = {}
+
+    async def add_socket(self, meeting_id: str, sid: str, user: dict) -> None:
+
+        self.presence.add(meeting_id, sid, user.get("id"), user.get("name"))
+
+    async def remove_socket(self, sid: str) -> Tuple[Optional[str], Optional[dict]]:
+
+        session = self.presence.remove(sid)
+        if session is None:
+            return None, None
+        return session.meeting_id, session.as_user()
+
+    async def meeting_of(self, sid: str) -> Optional[str]:
+
+        session = self.presence.get(sid)
+        return session.meeting_id if session else None
+
+    async def user_of(self, sid: str) -> Optional[dict]:
+
+        session = self.presence.get(sid)
+        return session.as_user() if session else None
+
+    async def find_user_socket(self, meeting_id: str, user_id: str) -> Optional[str]:
+
+        session = self.presence.find_user(meeting_id, user_id)
+        return session.sid if session else None
+
+    async def participants(self, meeting_id: str) -> Dict[str, dict]:
+
+        return {s.sid: s.as_user() for s in self.presence.participants(meeting_id)}
+
+    async def count(self, meeting_id: str) -> int:
+
+        return self.presence.count(meeting_id)
+
+    async def remove_meeting(self, meeting_id: str) -> List[str]:
+
+        self.meeting_languages.pop(meeting_id, None)
+        return self.presence.remove_meeting(meeting_id)
+
+    async def enable_captions(self, meeting_id: str, language: str) -> None:
+
+        self.meeting_languages[meeting_id] = language
+
+    async def disable_captions(self, meeting_id: str) -> None:
+
+        self.meeting_languages.pop(meeting_id, None)
+
+    async def captions_language(self, meeting_id: str) -> Optional[str]:
+
+        return self.meeting_languages.get(meeting_id)
+
+    async def purge_node(self) -> int:
+
+        # Nothing outlives the process.
+        return 0
+
+    def structures(self) -> Dict[str, object]:
+
+        return {
+            "presence.sessions": self.presence.sessions,
+            "presence.meetings": self.presence.meetings,
+            "captions.languages": self.meeting_languages,
+        }
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisState:
+    def __init__(self, client, prefix: str, node: str):
+        self.redis = client
+        self.node = node
+        self.sockets_key = f"{prefix}:sockets"
+        self.captions_key = f"{prefix}:captions"
+        self.meeting_prefix = f"{prefix}:meeting:"
+        self.users_prefix = f"{prefix}:users:"
+        self.node_prefix = f"{prefix}:node:"
+
+    def _meeting_key(self, meeting_id: str) -> str:
+
+        return f"{self.meeting_prefix}{meeting_id}"
+
+    def _users_key(self, meeting_id: str) -> str:
+
+        return f"{self.users_prefix}{meeting_id}"
+
+    def _node_key(self, node: str) -> str:
+
+        return f"{self.node_prefix}{node}"
+
+    async def add_socket(self, meeting_id: str, sid: str, user: dict) -> None:
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.sockets_key, sid, json.dumps({"meeting": meeting_id, "user": user, "node": self.node}))
+            pipe.hset(self._meeting_key(meeting_id), sid, json.dumps(user))
+            pipe.sadd(self._node_key(self.node), sid)
+            if user.get("id"):
+                pipe.hset(self._users_key(meeting_id), user["id"], sid)
+            await pipe.execute()
+
+    async def _socket(self, sid: str) -> Optional[dict]:
+
+        raw = await self.redis.hget(self.sockets_key, sid)
+        return json.loads(raw) if raw else None
+
+    async def remove_socket(self, sid: str) -> Tuple[Optional[str], Optional[dict]]:
+
+        entry = await self._socket(sid)
+        if not entry:
+            return None, None
+        meeting_id, user = entry["meeting"], entry["user"]
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hdel(self.sockets_key, sid)
+            pipe.hdel(self._meeting_key(meeting_id), sid)
+            pipe.srem(self._node_key(entry.get("node", self.node)), sid)
+            await pipe.execute()
+        if user.get("id"):
+            # Only release the user slot if a newer socket has not taken it.
+            users_key = self._users_key(meeting_id)
+            if await self.redis.hget(users_key, user["id"]) == sid:
+                await self.redis.hdel(users_key, user["id"])
+        return meeting_id, user
+
+    async def meeting_of(self, sid: str) -> Optional[str]:
+
+        entry = await self._socket(sid)
+        return entry["meeting"] if entry else None
+
+    async def user_of(self, sid: str) -> Optional[dict]:
+
+        entry = await self._socket(sid)
+        return entry["user"] if entry else None
+
+    async def find_user_socket(self, meeting_id: str, user_id: str) -> Optional[str]:
+
+        return await self.redis.hget(self._users_key(meeting_id), user_id)
+
+    async def participants(self, meeting_id: str) -> Dict[str, dict]:
+
+        raw = await self.redis.hgetall(self._meeting_key(meeting_id))
+        return {sid: json.loads(user) for sid, user in raw.items()}
+
+    async def count(self, meeting_id: str) -> int:
+
+        return await self.redis.hlen(self._meeting_key(meeting_id))
+
+    async def remove_meeting(self, meeting_id: str) -> List[str]:
+
+        meeting_key = self._meeting_key(meeting_id)
+        sids = await self.redis.hkeys(meeting_key)
+        entries = await self.redis.hmget(self.sockets_key, sids) if sids else []
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if sids:
+                pipe.hdel(self.sockets_key, *sids)
+            for sid, raw in zip(sids, entries):
+                node = json.loads(raw).get("node", self.node) if raw else self.node
+                pipe.srem(self._node_key(node), sid)
+            pipe.delete(meeting_key, self._users_key(meeting_id))
+            pipe.hdel(self.captions_key, meeting_id)
+            await pipe.execute()
+        return sids
+
+    async def enable_captions(self, meeting_id: str, language: str) -> None:
+
+        await self.redis.hset(self.captions_key, meeting_id, language)
+
+    async def disable_captions(self, meeting_id: str) -> None:
+
+        await self.redis.hdel(self.captions_key, meeting_id)
+
+    async def captions_language(self, meeting_id: str) -> Optional[str]:
+
+        return await self.redis.hget(self.captions_key, meeting_id)
+
+    async def purge_node(self) -> int:
+
+        # Sockets do not survive a restart, so whatever this node registered
+        # before it went down is stale and would otherwise stay forever.
+        sids = await self.redis.smembers(self._node_key(self.node))
+        meetings = set()
+        for sid in sids:
+            meeting_id, _ = await self.remove_socket(sid)
+            if meeting_id:
+                meetings.add(meeting_id)
+        await self.redis.delete(self._node_key(self.node))
+        for meeting_id in meetings:
+            if not await self.count(meeting_id):
+                await self.disable_captions(meeting_id)
+        if sids:
+            logger.info("Purged %s stale sockets of node %s from %s meetings", len(sids), self.node, len(meetings))
+        return len(sids)
+
+    def structures(self) -> Dict[str, object]:
+
+        # Everything lives in Redis; nothing to size in this process.
+        return {}
+
+    async def close(self) -> None:
+
+        await self.redis.aclose()
+
+
+def _state_node() -> str:
+
+    # Worker names repeat on every host running the launcher, so the host
+    # name keeps one host's restart from purging another's sockets.
+    host = socket.gethostname()
+    return f"{host}/{settings.NODE_ID}" if settings.NODE_ID else host
+
+
+def create_state():
+
+    backend = settings.STATE_BACKEND.lower()
+    if backend == "redis":
+        import redis.asyncio as aioredis
+        client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+        return RedisState(client, settings.STATE_KEY_PREFIX, _state_node())
+    if backend == "fakeredis":
+        # In-process stand-in with Redis semantics, for development and load tests.
+        from fakeredis import FakeAsyncRedis
+        return RedisState(FakeAsyncRedis(decode_responses=True), settings.STATE_KEY_PREFIX, _state_node())
+    if backend != "memory":
+        logger.warning("Unknown STATE_BACKEND %r; using in-memory socket state", settings.STATE_BACKEND)
+    return MemoryState()
+
+
+def create_client_manager():
+
+    if settings.STATE_BACKEND.lower() != "redis":
+        return None
+    return socketio.AsyncRedisManager(settings.REDIS_URL, channel=f"{settings.STATE_KEY_PREFIX}-socketio")
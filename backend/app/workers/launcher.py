@@ -0,0 +1,49 @@
+import argparse
+import asyncio
+import logging
+import os
+
+import uvicorn
+
+from app.core.config import settings
+from app.workers.router import Router
+from app.workers.supervisor import Supervisor
+
+logger = logging.getLogger(__name__)
+
+
+async def serve(workers: int, host: str, port: int, base_port: int) -> None:
+
+    supervisor = Supervisor(workers, base_port)
+    router = Router(supervisor, settings.WORKER_LOAD_INTERVAL_SECONDS, settings.RATE_LIMIT_TRUST_FORWARDED, settings.API_V1_PREFIX)
+    server = uvicorn.Server(uvicorn.Config(router, host=host, port=port, log_level="info", lifespan="on"))
+
+    await supervisor.start()
+    logger.info("Routing %s:%s to %s workers on ports %s-%s", host, port, workers, base_port, base_port + workers - 1)
+    try:
+        await server.serve()
+    finally:
+        await supervisor.stop()
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Run the backend as a router in front of several workers")
+    # Unless WORKERS asks for several, use one worker per core.
+    workers = settings.WORKERS if settings.WORKERS > 1 else os.cpu_count() or 1
+    parser.add_argument("--workers", type=int, default=workers)
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--base-port", type=int, default=settings.WORKER_BASE_PORT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # Workers only see each other's rooms and presence through a shared backend.
+    if args.workers > 1 and settings.STATE_BACKEND.lower() != "redis":
+        parser.error("running more than one worker needs STATE_BACKEND=redis")
+
+    asyncio.run(serve(args.workers, args.host, args.port, args.base_port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+import asyncio
+import json
+import logging
+import re
+from collections import Counter, OrderedDict
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+import httpx
+
+from app.sockets.hash_ring import HashRing
+from app.workers.supervisor import Supervisor, Worker
+
+try:
+    from websockets.asyncio.client import connect as ws_connect
+    WS_HEADERS_ARG = "additional_headers"
+except ImportError:
+    from websockets import connect as ws_connect
+    WS_HEADERS_ARG = "extra_headers"
+
+logger = logging.getLogger(__name__)
+
+SOCKETIO_PATH = "/socket.io"
+REPORT_PATH = "/router/workers"
+MAX_SESSIONS = 100000
+HOP_HEADERS = {b"connection", b"keep-alive", b"transfer-encoding", b"upgrade", b"host", b"content-length"}
+WS_SKIP_HEADERS = HOP_HEADERS | {
+    b"sec-websocket-key", b"sec-websocket-version", b"sec-websocket-extensions", b"sec-websocket-accept",
+}
+SID_PATTERN = re.compile(rb'"sid"\s*:\s*"([^"]+)"')
+LOOPBACK = {"127.0.0.1", "::1", "localhost"}
+MEETING_ID = r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+
+
+def _query_value(query: Dict[str, list], name: str) -> Optional[str]:
+
+    values = query.get(name)
+    return values[0] if values else None
+
+
+class Router:
+    def __init__(self, supervisor: Supervisor, load_interval: float, trust_forwarded: bool = False, api_prefix: str = "/api"):
+        self.supervisor = supervisor
+        self.load_interval = load_interval
+        self.trust_forwarded = trust_forwarded
+        # Engine.IO session id -> worker, so every poll and the websocket
+        # upgrade of a session reach the worker that created it.
+        self.sessions: "OrderedDict[str, str]" = OrderedDict()
+        self.requests: Counter = Counter()
+        self.inflight: Counter = Counter()
+        self.websockets: Counter = Counter()
+        self.load: Dict[str, dict] = {}
+        # Built from the same node list the workers get as MEETING_NODES, so
+        # the router and ActorRegistry.owns() always agree on a meeting's owner.
+        self.ring = HashRing(supervisor.names)
+        self.meeting_path = re.compile(
+            rf"^{re.escape(api_prefix)}/(?:meetings(?:/delete-meeting)?|captions)/({MEETING_ID})(?:/|$)"
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._poller: Optional[asyncio.Task] = None
+
+    async def __call__(self, scope, receive, send):
+
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] == "http" and scope["path"] == REPORT_PATH:
+            # Pids and ports are for operators on the host, not for clients.
+            if (scope.get("client") or ("", 0))[0] not in LOOPBACK:
+                return await self._send_json(send, 404, {"detail": "Not Found"})
+            return await self._send_json(send, 200, self.report())
+
+        worker = self._route(scope)
+        if worker is None:
+            if scope["type"] == "websocket":
+                return await send({"type": "websocket.close", "code": 1013})
+            return await self._send_json(send, 503, {"detail": "No workers available"})
+
+        self.requests[worker.name] += 1
+        if scope["type"] == "websocket":
+            return await self._proxy_websocket(worker, scope, receive, send)
+        return await self._proxy_http(worker, scope, receive, send)
+
+    def _least_busy(self) -> Optional[Worker]:
+
+        alive = self.supervisor.alive()
+        return min(alive, key=lambda w: self.inflight[w.name]) if alive else None
+
+    def _route(self, scope) -> Optional[Worker]:
+
+        workers = self.supervisor.workers
+        if not scope["path"].startswith(SOCKETIO_PATH):
+            # Calls about one meeting go to its owner as well: the meeting
+            # header cache is per worker, and an end or update served
+            # elsewhere would leave the owner's copy stale. While the owner
+            # restarts its cache is empty, so any worker will do.
+            match = self.meeting_path.match(scope["path"])
+            worker = workers.get(self.ring.node_for(match.group(1))) if match else None
+            return worker if worker is not None and worker.alive else self._least_busy()
+
+        query = parse_qs(scope.get("query_string", b"").decode())
+        sid = _query_value(query, "sid")
+        if sid and sid in self.sessions:
+            worker = workers.get(self.sessions[sid])
+            if worker is not None and worker.alive:
+                return worker
+
+        # Sockets carry meetingId in the connection query and land on the
+        # meeting's owner, which keeps its actor, caption state, presence and
+        # transcript on one worker. While the owner restarts its meetings are
+        # unavailable rather than split across workers.
+        meeting_id = _query_value(query, "meetingId")
+        if meeting_id:
+            worker = workers.get(self.ring.node_for(meeting_id))
+            return worker if worker is not None and worker.alive else None
+        # Without one, the worker that receives the join turns it away
+        # unless it owns the meeting.
+        return self._least_busy()
+
+    def _remember(self, sid: str, worker: Worker) -> None:
+
+        self.sessions[sid] = worker.name
+        self.sessions.move_to_end(sid)
+        while len(self.sessions) > MAX_SESSIONS:
+            self.sessions.popitem(last=False)
+
+    def _headers(self, scope, skip) -> list:
+
+        client = scope.get("client") or ("", 0)
+        forwarded = None
+        headers = []
+        for name, value in scope["headers"]:
+            lower = name.lower()
+            if lower == b"x-forwarded-for":
+                forwarded = value
+            elif lower not in skip:
+                headers.append((name, value))
+        # Workers trust this header for per-address rate limiting, so a
+        # client-supplied one is only kept when the router itself is behind a proxy.
+        address = client[0].encode()
+        if forwarded and self.trust_forwarded:
+            address = forwarded + b", " + address
+        headers.append((b"x-forwarded-for", address))
+        return headers
+
+    def _target(self, worker: Worker, scope, scheme: str) -> str:
+
+        query = scope.get("query_string", b"").decode()
+        return f"{scheme}://127.0.0.1:{worker.port}{scope['path']}" + (f"?{query}" if query else "")
+
+    async def _proxy_http(self, worker: Worker, scope, receive, send) -> None:
+
+        body = b""
+        more = True
+        while more:
+            message = await receive()
+            body += message.get("body", b"")
+            more = message.get("more_body", False)
+
+        query = parse_qs(scope.get("query_string", b"").decode())
+        handshake = scope["path"].startswith(SOCKETIO_PATH) and not _query_value(query, "sid")
+
+        self.inflight[worker.name] += 1
+        try:
+            request = self._client.build_request(
+                scope["method"],
+                self._target(worker, scope, "http"),
+                headers=self._headers(scope, HOP_HEADERS),
+                content=body
+            )
+            response = await self._client.send(request, stream=True)
+        except httpx.HTTPError:
+            self.inflight[worker.name] -= 1
+            logger.exception("Proxying %s to %s failed", scope["path"], worker.name)
+            return await self._send_json(send, 502, {"detail": "Worker unavailable"})
+
+        try:
+            headers = [(k, v) for k, v in response.headers.raw if k.lower() not in HOP_HEADERS]
+            if handshake:
+                content = await response.aread()
+                match = SID_PATTERN.search(content)
+                if match:
+                    self._remember(match.group(1).decode(), worker)
+                await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+                await send({"type": "http.response.body", "body": content})
+                return
+
+            await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+            async for chunk in response.aiter_raw():
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            self.inflight[worker.name] -= 1
+            await response.aclose()
+
+    async def _proxy_websocket(self, worker: Worker, scope, receive, send) -> None:
+
+        message = await receive()
+        if message["type"] != "websocket.connect":
+            return
+
+        try:
+            upstream = await ws_connect(
+                self._target(worker, scope, "ws"),
+                max_size=None,
+                ping_interval=None,
+                **{WS_HEADERS_ARG: [(k.decode("latin-1"), v.decode("latin-1")) for k, v in self._headers(scope, WS_SKIP_HEADERS)]}
+            )
+        except Exception:
+            logger.exception("Websocket connect to %s failed", worker.name)
+            return await send({"type": "websocket.close", "code": 1011})
+
+        await send({"type": "websocket.accept"})
+        self.websockets[worker.name] += 1
+
+        async def client_to_worker():
+            while True:
+                message = await receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+                data = message.get("bytes")
+                await upstream.send(data if data is not None else message.get("text", ""))
+
+        async def worker_to_client():
+            async for data in upstream:
+                if isinstance(data, bytes):
+                    await send({"type": "websocket.send", "bytes": data})
+                else:
+                    await send({"type": "websocket.send", "text": data})
+            await send({"type": "websocket.close", "code": upstream.close_code or 1000})
+
+        tasks = [asyncio.create_task(client_to_worker()), asyncio.create_task(worker_to_client())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await upstream.close()
+            self.websockets[worker.name] -= 1
+
+    async def _send_json(self, send, status: int, payload: dict) -> None:
+
+        body = json.dumps(payload).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive, send) -> None:
+
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self._client = httpx.AsyncClient(timeout=None, limits=httpx.Limits(max_connections=None))
+                self._poller = asyncio.create_task(self._poll_load())
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._poller:
+                    self._poller.cancel()
+                if self._client:
+                    await self._client.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _poll_load(self) -> None:
+
+        while True:
+            await asyncio.sleep(self.load_interval)
+            for worker in self.supervisor.alive():
+                try:
+                    response = await self._client.get(f"http://127.0.0.1:{worker.port}/health/load", timeout=2)
+                    self.load[worker.name] = response.json()
+                except Exception:
+                    self.load.pop(worker.name, None)
+            logger.info(
+                "Worker load: %s",
+                ", ".join(
+                    f"{w['name']}={w['websockets']}ws/{(w['load'] or {}).get('sockets', '?')}sockets"
+                    for w in self.report()["workers"]
+                )
+            )
+
+    def report(self) -> dict:
+
+        return {
+            "workers": [
+                {
+                    "name": w.name,
+                    "port": w.port,
+                    "pid": w.pid,
+                    "alive": w.alive,
+                    "restarts": w.restarts,
+                    "requests": self.requests[w.name],
+                    "inflight": self.inflight[w.name],
+                    "websockets": self.websockets[w.name],
+                    "load": self.load.get(w.name),
+                }
+                for w in self.supervisor.workers.values()
+            ],
+            "sessions": len(self.sessions),
+        }
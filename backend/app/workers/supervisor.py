@@ -0,0 +1,108 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_RESTART_DELAY = 30.0
+
+
+class Worker:
+    def __init__(self, name: str, port: int):
+        self.name = name
+        self.port = port
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.started_at = 0.0
+        self.restarts = 0
+
+    @property
+    def alive(self) -> bool:
+
+        return self.process is not None and self.process.returncode is None
+
+    @property
+    def pid(self) -> Optional[int]:
+
+        return self.process.pid if self.process else None
+
+
+class Supervisor:
+    def __init__(self, count: int, base_port: int, app_path: str = "app.main:application"):
+        self.app_path = app_path
+        self.workers: Dict[str, Worker] = {
+            f"worker-{i}": Worker(f"worker-{i}", base_port + i) for i in range(count)
+        }
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    @property
+    def names(self) -> List[str]:
+
+        return list(self.workers)
+
+    def alive(self) -> List[Worker]:
+
+        return [w for w in self.workers.values() if w.alive]
+
+    def _env(self, worker: Worker) -> dict:
+
+        env = dict(os.environ)
+        env.update({
+            "NODE_ID": worker.name,
+            "MEETING_NODES": json.dumps(self.names),
+            # Only the router talks to workers, and it sets X-Forwarded-For itself.
+            "RATE_LIMIT_TRUST_FORWARDED": "true",
+        })
+        return env
+
+    async def _spawn(self, worker: Worker) -> None:
+
+        worker.process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "uvicorn", self.app_path,
+            "--host", "127.0.0.1",
+            "--port", str(worker.port),
+            "--log-level", "info",
+            env=self._env(worker),
+        )
+        worker.started_at = time.monotonic()
+        logger.info("Started %s (pid %s) on port %s", worker.name, worker.pid, worker.port)
+
+    async def _watch(self, worker: Worker) -> None:
+
+        delay = 1.0
+        while not self._stopping:
+            await self._spawn(worker)
+            code = await worker.process.wait()
+            if self._stopping:
+                return
+            # A worker that stayed up for a while gets a fresh backoff.
+            if time.monotonic() - worker.started_at > MAX_RESTART_DELAY:
+                delay = 1.0
+            worker.restarts += 1
+            logger.error("%s exited with code %s; restarting in %.0fs", worker.name, code, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RESTART_DELAY)
+
+    async def start(self) -> None:
+
+        self._tasks = [asyncio.create_task(self._watch(w)) for w in self.workers.values()]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+
+        self._stopping = True
+        for worker in self.alive():
+            worker.process.terminate()
+        for worker in self.workers.values():
+            if worker.process is None:
+                continue
+            try:
+                await asyncio.wait_for(worker.process.wait(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("%s did not stop in %ss; killing it", worker.name, timeout)
+                worker.process.kill()
+        for task in self._tasks:
+            task.cancel()
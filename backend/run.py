@@ -2,10 +2,14 @@ import uvicorn
 from app.core.config import settings
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "app.main:application",
-        host=settings.HOST,
-        port=settings.PORT,
-        reload=settings.DEBUG,
-        log_level="info"
-    )
+    if settings.WORKERS != 1:
+        from app.workers.launcher import main
+        main()
+    else:
+        uvicorn.run(
+            "app.main:application",
+            host=settings.HOST,
+            port=settings.PORT,
+            reload=settings.DEBUG,
+            log_level="info"
+        )
@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.db import base
+from app.db.models import MEETINGS_COLLECTION, CAPTION_SEGMENTS_COLLECTION, CHAT_MESSAGES_COLLECTION
+from app.services.search_service import SearchService
+
+
+WORDS = (
+    "budget roadmap launch hiring design review deadline customer feedback release "
+    "migration database latency outage incident sprint planning marketing contract "
+    "invoice onboarding security audit dashboard metrics retention pricing demo"
+).split()
+
+
+def _sentence(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+async def seed(db, users: int, meetings: int, captions: int, messages: int, rng: random.Random) -> list:
+
+    await db[MEETINGS_COLLECTION].delete_many({})
+    await db[CAPTION_SEGMENTS_COLLECTION].delete_many({})
+    await db[CHAT_MESSAGES_COLLECTION].delete_many({})
+
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    start = datetime.utcnow() - timedelta(days=30)
+    for m in range(meetings):
+        meeting_id = str(uuid.uuid4())
+        members = rng.sample(user_ids, k=min(len(user_ids), rng.randint(2, 8)))
+        began = start + timedelta(hours=m)
+        await db[MEETINGS_COLLECTION].insert_one({
+            "meeting_id": meeting_id,
+            "title": f"Meeting {m}",
+            "host": members[0],
+            "participants": [{"user": u, "is_active": False} for u in members],
+            "status": "ended",
+            "start_time": began,
+            "created_at": began,
+        })
+        if messages:
+            await db[CHAT_MESSAGES_COLLECTION].insert_many([
+                {
+                    "meeting_id": meeting_id,
+                    "sender": rng.choice(members),
+                    "sender_name": "User",
+                    "text": _sentence(rng, rng.randint(3, 15)),
+                    "timestamp": began + timedelta(seconds=i * 10),
+                }
+                for i in range(messages)
+            ])
+        await db[CAPTION_SEGMENTS_COLLECTION].insert_many([
+            {
+                "meeting_id": meeting_id,
+                "seq": i + 1,
+                "speaker": rng.choice(members),
+                "speaker_name": "User",
+                "original_text": _sentence(rng, rng.randint(5, 25)),
+                "original_language": "en",
+                "translations": [],
+                "timestamp": began + timedelta(seconds=i * 3),
+                "duration": 3.0,
+                "offset": 0.0,
+                "is_final": True,
+            }
+            for i in range(captions)
+        ])
+    return user_ids
+
+
+def _percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+async def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Seed a benchmark corpus and report search latency")
+    parser.add_argument("--database", default=f"{settings.DATABASE_NAME}_search_bench")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--meetings", type=int, default=500)
+    parser.add_argument("--captions", type=int, default=400, help="caption segments per meeting")
+    parser.add_argument("--messages", type=int, default=100, help="chat messages per meeting")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--force", action="store_true", help="seed a database whose name does not end in _bench")
+    args = parser.parse_args()
+    # Seeding empties every collection it fills, so only touch scratch databases by default.
+    if not args.skip_seed and not args.database.endswith("_bench") and not args.force:
+        parser.error(f"refusing to seed {args.database!r}: the name must end in _bench, or pass --force")
+
+    rng = random.Random(42)
+    base.client = AsyncIOMotorClient(settings.MONGODB_URI)
+    db = base.client[args.database]
+    settings.DATABASE_NAME = args.database
+
+    if args.skip_seed:
+        user_ids = await db[MEETINGS_COLLECTION].distinct("host")
+    else:
+        t0 = time.perf_counter()
+        user_ids = await seed(db, args.users, args.meetings, args.captions, args.messages, rng)
+        print(f"seeded {args.meetings} meetings in {time.perf_counter() - t0:.1f}s")
+    await base.ensure_indexes()
+
+    service = SearchService(db)
+    latencies = []
+    for _ in range(args.queries):
+        query = " ".join(rng.sample(WORDS, k=rng.randint(1, 3)))
+        t0 = time.perf_counter()
+        await service.search(rng.choice(user_ids), query, limit=20)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    print(f"queries={len(latencies)} "
+          f"mean={statistics.mean(latencies):.1f}ms "
+          f"p50={_percentile(latencies, 50):.1f}ms "
+          f"p95={_percentile(latencies, 95):.1f}ms "
+          f"p99={_percentile(latencies, 99):.1f}ms")
+
+    base.client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
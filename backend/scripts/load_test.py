@@ -0,0 +1,364 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import struct
+import sys
+import time
+import urllib.request
+import uuid
+from collections import Counter, deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import socketio
+
+from app.sockets.audio_stream import ENCODING, SAMPLE_RATE, bytes_for_ms
+
+FRAME_MS = 20
+FRAME_BYTES = bytes_for_ms(FRAME_MS)
+ICE_PER_PEER = 8
+MAX_PENDING_CHUNKS = 64
+FAKE_SDP = "v=0\r\no=- 0 0 IN IP4 127.0.0.1\r\ns=-\r\nt=0 0\r\n" + "a=candidate-placeholder\r\n" * 60
+
+
+def _percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def _summary(samples: list) -> str:
+    if not samples:
+        return "n=0"
+    return (f"n={len(samples)} "
+            f"mean={statistics.mean(samples):.1f}ms "
+            f"p50={_percentile(samples, 50):.1f}ms "
+            f"p95={_percentile(samples, 95):.1f}ms "
+            f"p99={_percentile(samples, 99):.1f}ms")
+
+
+class Report:
+    def __init__(self):
+        self.join_ms = []
+        self.caption_ms = []
+        self.sent = Counter()
+        self.received = Counter()
+        self.errors = Counter()
+        self.server = []
+
+
+class SimClient:
+    def __init__(self, args, report: Report, meeting_id: str, index: int, speaker: bool, captions: bool):
+        self.args = args
+        self.report = report
+        self.meeting_id = meeting_id
+        self.user_id = f"load-{uuid.uuid4()}"
+        self.name = f"Load {index}"
+        self.speaker = speaker
+        self.captions = captions
+        self.rng = random.Random(index)
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.joined = asyncio.Event()
+        self.captions_on = asyncio.Event()
+        self.join_started = 0.0
+        # Completion time of each audio chunk the server has not captioned yet.
+        self.pending_chunks = deque(maxlen=MAX_PENDING_CHUNKS)
+        self._register()
+
+    def _register(self) -> None:
+
+        handlers = {
+            "existing-participants": self._on_existing,
+            "presence-snapshot": self._on_existing,
+            "user-joined": self._on_user_joined,
+            "offer": self._on_offer,
+            "caption-update": self._on_caption,
+            "caption-batch": self._on_caption_batch,
+            "join-error": self._on_join_error,
+            "captions-started": self._on_captions_started,
+        }
+        for event, handler in handlers.items():
+            self.sio.on(event, self._counted(event, handler))
+        self.sio.on("*", self._on_any)
+
+    def _counted(self, event: str, handler):
+
+        async def counted(*args):
+            self.report.received[event] += 1
+            await handler(*args)
+
+        return counted
+
+    async def _on_any(self, event, *args):
+
+        self.report.received[event] += 1
+
+    async def emit(self, event: str, data=None) -> None:
+
+        self.report.sent[event] += 1
+        try:
+            await self.sio.emit(event, data)
+        except Exception:
+            self.report.errors[f"emit:{event}"] += 1
+
+    async def _on_existing(self, participants):
+
+        # Whichever of existing-participants or presence-snapshot arrives first ends the join.
+        if not self.joined.is_set():
+            self.report.join_ms.append((time.perf_counter() - self.join_started) * 1000)
+            self.joined.set()
+
+    async def _on_join_error(self, data):
+
+        self.report.errors["join-error"] += 1
+        self.joined.set()
+
+    async def _on_captions_started(self, data):
+
+        if data.get("socketId") == self.sio.get_sid():
+            self.captions_on.set()
+
+    async def _on_user_joined(self, data):
+
+        # The peer already in the room starts the negotiation, as the web client does.
+        target = data.get("socketId")
+        await self.emit("offer", {"targetSocketId": target, "offer": {"type": "offer", "sdp": FAKE_SDP}})
+        await self._trickle(target)
+
+    async def _on_offer(self, data):
+
+        target = data.get("fromSocketId")
+        await self.emit("answer", {"targetSocketId": target, "answer": {"type": "answer", "sdp": FAKE_SDP}})
+        await self._trickle(target)
+
+    async def _trickle(self, target: str) -> None:
+
+        for i in range(ICE_PER_PEER):
+            await asyncio.sleep(self.rng.uniform(0.005, 0.03))
+            await self.emit("ice-candidate", {
+                "targetSocketId": target,
+                "candidate": {
+                    "candidate": f"candidate:{i} 1 udp {2122260223 - i} 10.0.{i}.1 {50000 + i} typ host",
+                    "sdpMid": "0",
+                    "sdpMLineIndex": 0,
+                },
+            })
+        await self.emit("ice-candidate", {"targetSocketId": target, "candidate": None})
+
+    def _caption_from(self, speaker_id) -> None:
+
+        if speaker_id == self.user_id and self.pending_chunks:
+            self.report.caption_ms.append((time.perf_counter() - self.pending_chunks.popleft()) * 1000)
+
+    async def _on_caption(self, data):
+
+        self._caption_from(data.get("speakerId"))
+
+    async def _on_caption_batch(self, data):
+
+        fields = data.get("fields") or []
+        if "speakerId" not in fields:
+            return
+        column = fields.index("speakerId")
+        for row in data.get("captions") or []:
+            self._caption_from(row[column])
+
+    async def run(self, deadline: float) -> None:
+
+        url = f"{self.args.url}?meetingId={self.meeting_id}"
+        try:
+            await self.sio.connect(url, transports=["websocket"], wait_timeout=30)
+        except Exception:
+            self.report.errors["connect"] += 1
+            return
+
+        try:
+            self.join_started = time.perf_counter()
+            await self.emit("join-meeting", {
+                "meetingId": self.meeting_id,
+                "userId": self.user_id,
+                "userName": self.name,
+                "features": self.args.features,
+            })
+            try:
+                await asyncio.wait_for(self.joined.wait(), 30)
+            except asyncio.TimeoutError:
+                self.report.errors["join-timeout"] += 1
+                return
+
+            if self.captions:
+                await self.emit("start_captions", {"meetingId": self.meeting_id, "language": "en"})
+
+            tasks = [
+                asyncio.create_task(asyncio.sleep(max(0.0, deadline - time.monotonic()))),
+                asyncio.create_task(self._chat(deadline)),
+            ]
+            if self.speaker:
+                tasks.append(asyncio.create_task(self._stream(deadline)))
+            await asyncio.gather(*tasks)
+            await self.emit("leave-meeting", {})
+        finally:
+            await self.sio.disconnect()
+
+    async def _chat(self, deadline: float) -> None:
+
+        interval = self.args.chat_interval
+        if interval <= 0:
+            return
+        while True:
+            delay = self.rng.expovariate(1.0 / interval)
+            if time.monotonic() + delay >= deadline:
+                return
+            await asyncio.sleep(delay)
+            await self.emit("send-chat-message", {"text": f"load message from {self.name}"})
+
+    async def _stream(self, deadline: float) -> None:
+
+        # Chunks sent before captions are on are never captioned and would
+        # skew the latency matching, so every speaker starts them itself.
+        try:
+            await asyncio.wait_for(self.captions_on.wait(), 10)
+        except asyncio.TimeoutError:
+            self.report.errors["captions-not-started"] += 1
+            return
+
+        self.report.sent["audio-stream-start"] += 1
+        try:
+            ack = await self.sio.call("audio-stream-start", {
+                "encoding": ENCODING,
+                "sampleRate": SAMPLE_RATE,
+                "channels": 1,
+                "language": "en",
+            }, timeout=10)
+        except Exception:
+            self.report.errors["audio-stream-start"] += 1
+            return
+        if not ack or not ack.get("ok"):
+            self.report.errors["audio-stream-start"] += 1
+            return
+
+        frames_per_chunk = max(1, ack["chunkMs"] // FRAME_MS)
+        pcm = bytes(self.rng.getrandbits(8) for _ in range(FRAME_BYTES))
+        started = time.monotonic()
+        seq = 0
+        # Frames are paced against the start time so event-loop lag does
+        # not stretch the stream.
+        while time.monotonic() < deadline:
+            await self.emit("audio-frame", struct.pack("<I", seq) + pcm)
+            seq += 1
+            if seq % frames_per_chunk == 0:
+                self.pending_chunks.append(time.perf_counter())
+            await asyncio.sleep(max(0.0, started + seq * FRAME_MS / 1000.0 - time.monotonic()))
+
+        self.report.sent["audio-stream-stop"] += 1
+        try:
+            await self.sio.call("audio-stream-stop", {}, timeout=10)
+        except Exception:
+            self.report.errors["audio-stream-stop"] += 1
+
+
+def _fetch_json(url: str):
+
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return json.loads(response.read())
+
+
+async def _server_load(base_url: str) -> list:
+
+    # Behind the multi-worker router, report every worker's load.
+    try:
+        report = await asyncio.to_thread(_fetch_json, f"{base_url}/router/workers")
+        return [w["load"] for w in report["workers"] if w.get("load")]
+    except Exception:
+        pass
+    try:
+        return [await asyncio.to_thread(_fetch_json, f"{base_url}/health/load")]
+    except Exception:
+        return []
+
+
+async def _sample_server(base_url: str, report: Report, interval: float, stop: asyncio.Event) -> None:
+
+    while not stop.is_set():
+        loads = await _server_load(base_url)
+        if loads:
+            report.server.append((time.monotonic(), loads))
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+def _print_report(report: Report, elapsed: float) -> None:
+
+    print(f"join latency:    {_summary(report.join_ms)}")
+    print(f"caption latency: {_summary(report.caption_ms)}")
+
+    print("client events/s (sent):")
+    for event, count in report.sent.most_common():
+        print(f"  {event:<24} {count / elapsed:10.1f}")
+    print("client events/s (received):")
+    for event, count in report.received.most_common():
+        print(f"  {event:<24} {count / elapsed:10.1f}")
+    if report.errors:
+        print(f"errors: {dict(report.errors)}")
+
+    if len(report.server) >= 2:
+        (t0, first), (t1, last) = report.server[0], report.server[-1]
+        emits = sum(w.get("emits") or 0 for w in last) - sum(w.get("emits") or 0 for w in first)
+        recipients = sum(w.get("recipients") or 0 for w in last) - sum(w.get("recipients") or 0 for w in first)
+        print(f"server emits/s: {emits / (t1 - t0):.1f} (deliveries/s: {recipients / (t1 - t0):.1f})")
+    rss = [sum(w.get("rssBytes") or 0 for w in loads) for _, loads in report.server]
+    if rss and max(rss):
+        print(f"server rss: start={rss[0] / 2**20:.1f}MiB peak={max(rss) / 2**20:.1f}MiB end={rss[-1] / 2**20:.1f}MiB")
+
+
+async def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Drive simulated meeting participants against a running server")
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--meetings", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=60, help="seconds each client stays after joining")
+    parser.add_argument("--ramp", type=float, default=100, help="new connections per second")
+    parser.add_argument("--speakers-per-meeting", type=int, default=1)
+    parser.add_argument("--chat-interval", type=float, default=15, help="mean seconds between chat messages per client (0 disables)")
+    parser.add_argument("--features", default="caption-batch,ice-batch", help="comma-separated join-meeting features")
+    parser.add_argument("--sample-interval", type=float, default=2)
+    args = parser.parse_args()
+    args.url = args.url.rstrip("/")
+    args.features = [f for f in args.features.split(",") if f]
+
+    report = Report()
+    meeting_ids = [f"load-{uuid.uuid4()}" for _ in range(args.meetings)]
+    seats = Counter()
+    clients = []
+    for i in range(args.clients):
+        meeting_id = meeting_ids[i % args.meetings]
+        seat = seats[meeting_id]
+        seats[meeting_id] += 1
+        speaker = seat < args.speakers_per_meeting
+        clients.append(SimClient(args, report, meeting_id, i, speaker, speaker or seat == 0))
+
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample_server(args.url, report, args.sample_interval, stop))
+    started = time.monotonic()
+    tasks = []
+    for i, client in enumerate(clients):
+        await asyncio.sleep(max(0.0, started + i / args.ramp - time.monotonic()))
+        tasks.append(asyncio.create_task(client.run(time.monotonic() + args.duration)))
+    print(f"ramped {len(clients)} clients into {args.meetings} meetings in {time.monotonic() - started:.1f}s")
+
+    await asyncio.gather(*tasks)
+    elapsed = time.monotonic() - started
+    stop.set()
+    await sampler
+
+    _print_report(report, elapsed)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReplaceOne
+
+from app.core.config import settings
+from app.db import base
+from app.db.models import MEETINGS_COLLECTION, CHAT_MESSAGES_COLLECTION
+
+
+def _message_id(meeting_id: str, index: int) -> ObjectId:
+
+    # Derived ids make the migration safe to re-run after a partial failure.
+    return ObjectId(hashlib.sha1(f"{meeting_id}:{index}".encode("utf-8")).digest()[:12])
+
+
+def _convert(meeting_id: str, index: int, message: dict, fallback_time) -> dict:
+
+    timestamp = message.get("timestamp") or fallback_time
+    return {
+        "_id": _message_id(meeting_id, index),
+        "meeting_id": meeting_id,
+        "sender": str(message["sender"]) if message.get("sender") else None,
+        "sender_name": message.get("sender_name") or message.get("senderName") or "Unknown",
+        "text": message.get("text") or "",
+        "timestamp": timestamp,
+    }
+
+
+async def migrate(db, batch_size: int, dry_run: bool) -> None:
+
+    meetings = db[MEETINGS_COLLECTION]
+    chat = db[CHAT_MESSAGES_COLLECTION]
+
+    migrated_meetings = 0
+    migrated_messages = 0
+    cursor = meetings.find(
+        {"messages.0": {"$exists": True}},
+        {"meeting_id": 1, "messages": 1, "created_at": 1}
+    )
+    async for meeting in cursor:
+        meeting_id = meeting["meeting_id"]
+        docs = [
+            _convert(meeting_id, i, m, meeting.get("created_at"))
+            for i, m in enumerate(meeting.get("messages") or [])
+        ]
+        if dry_run:
+            print(f"{meeting_id}: {len(docs)} messages")
+        else:
+            for start in range(0, len(docs), batch_size):
+                await chat.bulk_write(
+                    [ReplaceOne({"_id": d["_id"]}, d, upsert=True) for d in docs[start:start + batch_size]],
+                    ordered=False
+                )
+            await meetings.update_one({"_id": meeting["_id"]}, {"$unset": {"messages": ""}})
+        migrated_meetings += 1
+        migrated_messages += len(docs)
+
+    if not dry_run:
+        await meetings.update_many({"messages": {"$size": 0}}, {"$unset": {"messages": ""}})
+    action = "would move" if dry_run else "moved"
+    print(f"{action} {migrated_messages} messages from {migrated_meetings} meetings")
+
+
+async def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Move embedded meeting chat into the chat_messages collection")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    base.client = AsyncIOMotorClient(settings.MONGODB_URI)
+    db = base.get_database()
+    if not args.dry_run:
+        await base.ensure_indexes()
+    await migrate(db, args.batch_size, args.dry_run)
+    base.client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+# Settings are read at import time; these stand in for a real .env.
+os.environ.setdefault("MONGODB_URI", "mongomock://")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("CLOUDINARY_CLOUD_NAME", "test")
+os.environ.setdefault("CLOUDINARY_API_KEY", "test")
+os.environ.setdefault("CLOUDINARY_API_SECRET", "test")
+os.environ.setdefault("TRANSCRIPTION_BACKEND", "stub")
+
+
+@pytest.fixture
+def db(monkeypatch, tmp_path):
+
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from app.core.config import settings
+    from app.db import base
+
+    monkeypatch.setattr(base, "client", mongomock_motor.AsyncMongoMockClient())
+    monkeypatch.setattr(settings, "TRANSCRIPT_DIR", str(tmp_path / "transcripts"))
+    return base.get_database()
@@ -0,0 +1,76 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.db.models import CAPTION_SEGMENTS_COLLECTION, CHAT_MESSAGES_COLLECTION, MEETINGS_COLLECTION
+from app.services.archive_service import ArchiveService
+from app.services.chat_service import chat_message
+
+
+class _CrashingDelete:
+    # Deletes a couple of rows and then loses the connection.
+    def __init__(self, collection):
+        self.collection = collection
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    async def delete_many(self, query):
+        doomed = await self.collection.find(query).limit(2).to_list(length=2)
+        await self.collection.delete_many({"_id": {"$in": [d["_id"] for d in doomed]}})
+        raise ConnectionError("connection lost")
+
+
+async def _seed(db, meeting_id):
+
+    start = datetime.utcnow() - timedelta(days=30)
+    await db[MEETINGS_COLLECTION].insert_one({"meeting_id": meeting_id, "status": "ended", "end_time": start})
+    await db[CAPTION_SEGMENTS_COLLECTION].insert_many([
+        {"meeting_id": meeting_id, "seq": seq, "original_text": f"caption {seq}", "timestamp": start}
+        for seq in range(1, 6)
+    ])
+    await db[CHAT_MESSAGES_COLLECTION].insert_many([
+        chat_message(meeting_id, "u1", "Ada", f"message {i}", start + timedelta(seconds=i))
+        for i in range(4)
+    ])
+
+
+def test_retry_after_crash_between_deletes_keeps_everything(db):
+
+    async def scenario():
+        await _seed(db, "m1")
+
+        crashing = ArchiveService(db)
+        crashing.chat = _CrashingDelete(crashing.chat)
+        assert not await crashing.archive_meeting("m1")
+        # The captions are gone from the hot tier and half the chat with them.
+        assert not await db[CAPTION_SEGMENTS_COLLECTION].count_documents({"meeting_id": "m1"})
+        assert await db[CHAT_MESSAGES_COLLECTION].count_documents({"meeting_id": "m1"}) == 2
+
+        service = ArchiveService(db)
+        assert await service.archive_meeting("m1")
+        return await service.load("m1")
+
+    archive = asyncio.run(scenario())
+
+    assert [c["seq"] for c in archive["captions"]] == [1, 2, 3, 4, 5]
+    assert [m["text"] for m in archive["messages"]] == [f"message {i}" for i in range(4)]
+
+
+def test_retry_after_partial_caption_delete_keeps_everything(db):
+
+    async def scenario():
+        await _seed(db, "m2")
+
+        crashing = ArchiveService(db)
+        crashing.segments = _CrashingDelete(crashing.segments)
+        assert not await crashing.archive_meeting("m2")
+        assert await db[CAPTION_SEGMENTS_COLLECTION].count_documents({"meeting_id": "m2"}) == 3
+
+        service = ArchiveService(db)
+        assert await service.archive_meeting("m2")
+        return await service.load("m2")
+
+    archive = asyncio.run(scenario())
+
+    assert [c["seq"] for c in archive["captions"]] == [1, 2, 3, 4, 5]
+    assert len(archive["messages"]) == 4
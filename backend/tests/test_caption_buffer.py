@@ -0,0 +1,27 @@
+from app.sockets.caption_buffer import CaptionRingBuffer
+
+
+def _buffer(*seqs):
+
+    buffer = CaptionRingBuffer(10)
+    for seq in seqs:
+        buffer.append({"seq": seq})
+    return buffer
+
+
+def test_since_returns_captions_after_last_seq():
+
+    assert [p["seq"] for p in _buffer(1, 2, 3, 4).since(2)] == [3, 4]
+    assert _buffer(1, 2, 3).since(3) == []
+
+
+def test_since_falls_back_when_older_captions_were_evicted():
+
+    assert _buffer(5, 6).since(2) is None
+
+
+def test_since_falls_back_on_a_gap():
+
+    # Seq 3 was saved through the REST endpoint and never buffered.
+    assert _buffer(1, 2, 4, 5).since(1) is None
+    assert [p["seq"] for p in _buffer(1, 2, 4, 5).since(4)] == [5]
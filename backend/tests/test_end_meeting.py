@@ -0,0 +1,35 @@
+import asyncio
+
+from app.db.models import MEETINGS_COLLECTION
+from app.models.caption import CaptionEntryCreate
+from app.services import meeting_service
+from app.services.caption_service import CaptionService
+from app.sockets import socket_manager
+from app.utils import io
+
+
+def test_captions_ready_reaches_participants_after_end(db, monkeypatch):
+
+    emitted = []
+
+    async def emit(event, data=None, to=None, room=None, skip_sid=None, **kwargs):
+        emitted.append((event, to if to is not None else room))
+
+    monkeypatch.setattr(socket_manager.sio, "emit", emit)
+    monkeypatch.setattr(io, "_io_instance", socket_manager.sio)
+    monkeypatch.setattr(meeting_service, "cloudinary_upload_file", lambda *args: {})
+
+    async def scenario():
+        await db[MEETINGS_COLLECTION].insert_one({"meeting_id": "m1", "status": "active", "participants": []})
+        await socket_manager.state.add_socket("m1", "sid-1", {"id": "u1", "name": "Ada"})
+        await CaptionService(db).add_caption("m1", CaptionEntryCreate(original_text="hello", is_final=True))
+
+        await socket_manager.end_meeting("sid-1", {"meetingId": "m1"})
+        # Teardown has closed the meeting room by now.
+        assert not await socket_manager.state.count("m1")
+        await asyncio.gather(*meeting_service._background_tasks)
+
+    asyncio.run(scenario())
+
+    targets = [to for event, to in emitted if event == "captions-ready"]
+    assert targets and "sid-1" in targets[0]
@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from app.sockets.state import RedisState
+
+
+def test_restarted_node_purges_its_stale_sockets():
+
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    async def scenario():
+        crashed = RedisState(client, "test", "host/worker-0")
+        other = RedisState(client, "test", "host/worker-1")
+        await crashed.add_socket("m1", "sid-a", {"id": "u1", "name": "Ada"})
+        await other.add_socket("m2", "sid-b", {"id": "u2", "name": "Bo"})
+        await crashed.enable_captions("m1", "en")
+
+        restarted = RedisState(client, "test", "host/worker-0")
+        assert await restarted.purge_node() == 1
+        return (
+            await restarted.count("m1"),
+            await restarted.find_user_socket("m1", "u1"),
+            await restarted.captions_language("m1"),
+            await restarted.participants("m2"),
+        )
+
+    count, user_socket, language, survivors = asyncio.run(scenario())
+
+    assert count == 0
+    assert user_socket is None
+    assert language is None
+    assert list(survivors) == ["sid-b"]
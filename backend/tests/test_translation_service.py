@@ -0,0 +1,42 @@
+import asyncio
+import json
+
+import httpx
+
+from app.services.translation_service import TranslationService
+
+
+def _stub_server(requests):
+
+    # Answers like LibreTranslate's batch endpoint: one translation per q.
+    def handle(request):
+        payload = json.loads(request.content)
+        requests.append(payload["q"])
+        return httpx.Response(200, json={"translatedText": [f"{payload['target']}:{q}" for q in payload["q"]]})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handle))
+
+
+def test_concurrent_captions_share_one_batched_request():
+
+    requests = []
+
+    async def scenario():
+        service = TranslationService()
+        service._client = _stub_server(requests)
+        first = await asyncio.gather(
+            service.translate("hello", "en", "es"),
+            service.translate("world", "en", "es"),
+            service.translate("hello", "en", "es"),
+        )
+        again = await service.translate("hello", "en", "es")
+        await service.aclose()
+        return first, again, service.cache_hits
+
+    first, again, cache_hits = asyncio.run(scenario())
+
+    assert first == ["es:hello", "es:world", "es:hello"]
+    assert requests == [["hello", "world"]]
+    assert again == "es:hello"
+    assert cache_hits == 1
+
@@ -501,7 +501,7 @@ view.setUint32(4, 36 + samples.length * 2, true);
           localVideoRef.current.srcObject = localStream;
         }
 
-        const sock = io(SOCKET_SERVER_URL, { transports: ["websocket"] });
+        const sock = io(SOCKET_SERVER_URL, { transports: ["websocket"], query: { meetingId } });
         setSocket(sock);
         sock.on("connect", () => {
           setSelfSocketId(sock.id);